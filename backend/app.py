@@ -11,21 +11,34 @@ Features:
 - Metadata extraction
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+from werkzeug.utils import secure_filename
 import os
 import shutil
 import json
 import time
 import numpy as np
-from datetime import datetime
+import uuid
+import queue
+import tempfile
+import atexit
 import logging
+import threading
+import itertools
+from logging.handlers import QueueHandler, QueueListener
+from sqlalchemy import text, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload, load_only, raiseload
+from concurrent.futures import ThreadPoolExecutor
 
 # Import SQLAlchemy models (Phase 1)
 from models import (
     Session, Photo, Cluster, FaceEmbedding, 
-    DetectedObject, PhotoCluster
+    DetectedObject, PhotoCluster, LibraryStat
 )
+from services.bulk_insert import bulk_insert
+from services.meta_cache import clear_cache
 
 # Import vision services (Phase 2)
 try:
@@ -38,29 +51,379 @@ except ImportError as e:
     print("    Make sure backend/services/ directory exists with all service modules")
     SERVICES_AVAILABLE = False
 
-# Setup logging
+# Setup logging: records go through a queue so request/pipeline threads never
+# block on stderr writes; a listener thread does the actual formatting + I/O
+log_queue = queue.Queue(-1)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+log_listener = QueueListener(log_queue, _log_stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[QueueHandler(log_queue)],
+    force=True  # services/ call basicConfig on import; replace their handler
 )
 logger = logging.getLogger(__name__)
 
+class UploadRequest(Request):
+    """
+    Request that spools /api/upload file parts straight into UPLOAD_FOLDER,
+    so saving an upload is a rename instead of a second full copy
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.path != '/api/upload':
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return tempfile.NamedTemporaryFile(
+            'wb+', dir=UPLOAD_FOLDER, prefix=UPLOAD_TEMP_PREFIX, delete=False
+        )
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ORGANIZED_FOLDER = 'organized_photos'
 THUMBNAILS_FOLDER = 'thumbnails'
+PIPELINE_BATCH_SIZE = 16  # Photos per batched YOLO/CLIP forward pass
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Stream uploads to disk in 1 MiB chunks
+UPLOAD_TEMP_PREFIX = '.upload_'  # Spooled upload parts awaiting a final name
+ORGANIZE_COPY_WORKERS = 8  # Parallel file copies in organize_photos
+SSE_KEEPALIVE_SECONDS = 15  # Comment line sent on idle SSE streams
+PROCESS_JOB_RETENTION = 3600  # Seconds a finished job's result stays queryable
+EXISTS_CHECK_WORKERS = 16  # Parallel os.path.exists calls in process_photos
+PHOTO_COUNT_TTL = 30  # Seconds /api/health may serve a cached photo count
+FACE_CLUSTER_EPS = 0.6  # Max face encoding distance within one person
+STATS_KEYS = (
+    'total_photos', 'total_clusters', 'processed_faces', 'detected_objects',
+    'photos_with_emotions', 'photos_with_scenes'
+)  # Running totals in library_stats, served by /api/stats
+
+# Background executor for vision pipeline work (keeps analysis overlapped
+# with the DB writes done on the request thread)
+pipeline_executor = ThreadPoolExecutor(max_workers=2)
+
+# Background processing jobs: /api/process enqueues, one worker thread runs
+# them in order (a single consumer keeps the GPU models uncontended)
+process_jobs = {}  # job_id -> {'status', 'events', 'result', 'finished_at'}
+process_jobs_lock = threading.Lock()
+process_job_queue = queue.Queue()
+
+# Uploads are analyzed ahead of /api/process on a background thread; results
+# wait here until the process job saves them
+prefetch_queue = queue.Queue()  # lists of (photo_id, path), one per batch
+prefetched_results = {}  # photo_id -> pipeline result
+prefetched_lock = threading.Lock()
+
+# The vision models are not thread-safe: every PIPELINE.process_photos_batch
+# call (prefetch worker and process jobs alike) runs under this lock
+pipeline_lock = threading.Lock()
+
+# Cached photo count so /api/health doesn't run COUNT(*) on every probe
+_photo_count_cache = {'value': None, 'expires': 0.0}
+_photo_count_lock = threading.Lock()
 
 # Create folders
 for folder in [UPLOAD_FOLDER, ORGANIZED_FOLDER, THUMBNAILS_FOLDER]:
     os.makedirs(folder, exist_ok=True)
 
+# Load models once per worker and keep them resident for every request.
+# Warm-up happens here, at import (LUMEO_PREWARM=0 leaves each model to load
+# on first use instead)
+PIPELINE = None
+FACE_SERVICE = None
+if SERVICES_AVAILABLE:
+    try:
+        PIPELINE = get_pipeline()
+        FACE_SERVICE = get_face_service()
+        if os.getenv('LUMEO_PREWARM', '1') != '0':
+            PIPELINE.warm_up()
+    except Exception as e:
+        logger.error(f"Failed to initialize vision services: {str(e)}")
+        SERVICES_AVAILABLE = False
+
 logger.info("✓ Lumeo backend initialized")
 logger.info(f"✓ Services available: {SERVICES_AVAILABLE}")
 
+def copy_file(src, dst):
+    """
+    Copy a file in-kernel with os.copy_file_range (reflink on CoW filesystems)
+    Falls back to shutil.copy2 where the syscall isn't available (e.g. macOS)
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        shutil.copystat(src, dst)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst)
+
+def link_file(src, dst):
+    """
+    Hard-link dst to src so no bytes are copied (both names share one inode)
+    Falls back to copy_file across filesystems or where links aren't allowed
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        copy_file(src, dst)
+
+def get_photo_count():
+    """
+    Photo count for /api/health, cached for PHOTO_COUNT_TTL seconds
+    Upload/reset adjust the cached value directly so it stays accurate
+    """
+    with _photo_count_lock:
+        if _photo_count_cache['value'] is None or time.time() >= _photo_count_cache['expires']:
+            session = Session()
+            try:
+                _photo_count_cache['value'] = session.query(Photo).count()
+            finally:
+                session.close()
+            _photo_count_cache['expires'] = time.time() + PHOTO_COUNT_TTL
+        return _photo_count_cache['value']
+
+def adjust_photo_count(delta=None):
+    """Add delta to the cached photo count, or drop the cache when delta is None"""
+    with _photo_count_lock:
+        if delta is None or _photo_count_cache['value'] is None:
+            _photo_count_cache['value'] = None
+        else:
+            _photo_count_cache['value'] += delta
+
+def _spooled_upload_path(file):
+    """Path of the temp file an upload was spooled into, if it's in UPLOAD_FOLDER"""
+    temp_path = getattr(file.stream, 'name', None)
+    if not isinstance(temp_path, str):
+        return None
+    if os.path.dirname(os.path.abspath(temp_path)) != os.path.abspath(UPLOAD_FOLDER):
+        return None
+    return temp_path
+
+def store_upload(file, filepath):
+    """Move a spooled upload into place (rename), or stream-copy it as a fallback"""
+    temp_path = _spooled_upload_path(file)
+    if temp_path:
+        file.stream.close()
+        os.replace(temp_path, filepath)
+    else:
+        file.save(filepath, buffer_size=UPLOAD_CHUNK_SIZE)
+
+def discard_upload(file):
+    """Remove a spooled upload that was never moved into place"""
+    temp_path = _spooled_upload_path(file)
+    if temp_path and os.path.exists(temp_path):
+        file.stream.close()
+        os.remove(temp_path)
+
+def publish_job_event(job_id, event, data):
+    """Push an SSE event onto a processing job's stream"""
+    process_jobs[job_id]['events'].put((event, data))
+
+def prune_finished_jobs():
+    """Forget jobs that finished more than PROCESS_JOB_RETENTION seconds ago"""
+    cutoff = time.time() - PROCESS_JOB_RETENTION
+    for job_id in [
+        jid for jid, job in process_jobs.items()
+        if job['finished_at'] is not None and job['finished_at'] < cutoff
+    ]:
+        del process_jobs[job_id]
+
+def process_worker_loop():
+    """Run queued processing jobs one at a time"""
+    while True:
+        job_id = process_job_queue.get()
+        job = process_jobs[job_id]
+        job['status'] = 'running'
+        publish_job_event(job_id, 'status', {'status': 'running'})
+        
+        try:
+            result, status_code = run_process_job(job_id)
+        except Exception as e:
+            logger.error(f"Processing job {job_id} crashed: {str(e)}")
+            result, status_code = {'error': str(e)}, 500
+        finally:
+            # One session per job; release it before the next one
+            Session.remove()
+        
+        job['result'] = result
+        job['status'] = 'complete' if status_code < 400 else 'failed'
+        job['finished_at'] = time.time()
+        publish_job_event(job_id, job['status'], result)
+
+def prefetch_worker_loop():
+    """Analyze freshly uploaded photos before /api/process asks for them"""
+    while True:
+        batch = prefetch_queue.get()
+        try:
+            # Results are stored before the lock is released, so a process job
+            # waiting on the lock picks up this batch instead of redoing it
+            with pipeline_lock:
+                results = PIPELINE.process_photos_batch(
+                    [path for _, path in batch],
+                    [photo_id for photo_id, _ in batch],
+                    batch_size=PIPELINE_BATCH_SIZE
+                )
+                with prefetched_lock:
+                    for (photo_id, _), result in zip(batch, results):
+                        if result.get('analysis_complete'):
+                            prefetched_results[photo_id] = result
+        except Exception as e:
+            logger.error(f"Prefetch analysis failed: {str(e)}")
+
+def drain_prefetch_queue():
+    """Drop queued prefetch batches (the caller will analyze those photos itself)"""
+    while True:
+        try:
+            prefetch_queue.get_nowait()
+        except queue.Empty:
+            return
+
+def discard_prefetched(photo_ids):
+    """Forget prefetched results a finished job did not consume"""
+    with prefetched_lock:
+        for photo_id in photo_ids:
+            prefetched_results.pop(photo_id, None)
+
+def analyze_photos(pipeline, photo_paths, photo_ids):
+    """
+    Pipeline results for a batch, reusing anything prefetched at upload time
+    
+    Returns:
+        list: Analysis results, in the same order as photo_paths
+    """
+    # Holding pipeline_lock first lets an in-flight prefetch batch finish and
+    # publish its results before we look for them
+    with pipeline_lock:
+        with prefetched_lock:
+            cached = {
+                photo_id: prefetched_results.pop(photo_id)
+                for photo_id in photo_ids if photo_id in prefetched_results
+            }
+        
+        pending = [(path, photo_id) for path, photo_id in zip(photo_paths, photo_ids) if photo_id not in cached]
+        fresh = iter(pipeline.process_photos_batch(
+            [path for path, _ in pending],
+            [photo_id for _, photo_id in pending],
+            batch_size=PIPELINE_BATCH_SIZE
+        ) if pending else [])
+    
+    return [cached[photo_id] if photo_id in cached else next(fresh) for photo_id in photo_ids]
+
+def bump_stats(session, **deltas):
+    """
+    Add to the /api/stats running totals inside the caller's transaction
+    
+    Args:
+        session: Database session (committed by the caller)
+        **deltas: key=amount pairs, e.g. processed_faces=12
+    """
+    rows = [{'key': key, 'value': value} for key, value in deltas.items() if value]
+    if not rows:
+        return
+    
+    upsert = pg_insert(LibraryStat).values(rows)
+    session.execute(upsert.on_conflict_do_update(
+        index_elements=[LibraryStat.key],
+        set_={'value': LibraryStat.value + upsert.excluded.value}
+    ))
+
+def load_cluster_centroids(session):
+    """
+    Mean face encoding of every existing cluster (averaged in PostgreSQL)
+    
+    Returns:
+        tuple: (list of cluster_ids, (K, 128) float32 centroid matrix)
+    """
+    rows = session.query(
+        FaceEmbedding.cluster_id,
+        func.avg(FaceEmbedding.embedding, type_=FaceEmbedding.embedding.type)
+    ).filter(FaceEmbedding.cluster_id != None).group_by(FaceEmbedding.cluster_id).all()
+    
+    if not rows:
+        return [], np.empty((0, 0), dtype=np.float32)
+    
+    cluster_ids = [cluster_id for cluster_id, _ in rows]
+    centroids = np.array([centroid.to_list() for _, centroid in rows], dtype=np.float32)
+    
+    return cluster_ids, centroids
+
+def next_cluster_number(session):
+    """First unused N for a new 'cluster_N' id"""
+    numbers = [
+        int(cluster_id.split('_')[-1])
+        for (cluster_id,) in session.query(Cluster.cluster_id)
+        if cluster_id.split('_')[-1].isdigit()
+    ]
+    return max(numbers) + 1 if numbers else 0
+
+def photo_summary(photo):
+    """Photo fields returned to the frontend in cluster listings"""
+    return {
+        'photo_id': photo.photo_id,
+        'filename': photo.filename,
+        'path': photo.filename  # Frontend expects filename
+    }
+
+def cluster_listing(session, cluster_id=None):
+    """
+    Clusters with their photos from one LEFT JOIN, grouped in Python
+    
+    Only the columns the listing needs are selected, so no embeddings are read.
+    
+    Args:
+        session: Database session
+        cluster_id: Optional cluster to restrict the listing to
+    
+    Returns:
+        list: Cluster dicts, each with a 'photos' list
+    """
+    query = session.query(
+        Cluster.cluster_id, Cluster.name, Cluster.face_count, Cluster.thumbnail,
+        Photo.photo_id, Photo.filename
+    ).outerjoin(
+        PhotoCluster, PhotoCluster.cluster_id == Cluster.cluster_id
+    ).outerjoin(
+        Photo, Photo.photo_id == PhotoCluster.photo_id
+    )
+    if cluster_id is not None:
+        query = query.filter(Cluster.cluster_id == cluster_id)
+    
+    rows = query.order_by(Cluster.cluster_id).all()
+    
+    return [
+        {
+            'cluster_id': key[0],
+            'name': key[1],
+            'face_count': key[2],
+            'thumbnail': key[3],
+            'photos': [photo_summary(row) for row in group if row.photo_id is not None]
+        }
+        for key, group in itertools.groupby(rows, key=lambda row: tuple(row[:4]))
+    ]
+
+@app.teardown_request
+def remove_session(exception=None):
+    """Release the request's scoped session back to the pool"""
+    Session.remove()
+
+@app.teardown_request
+def discard_spooled_uploads(exception=None):
+    """Delete upload parts that were spooled to disk but never stored"""
+    if request.path == '/api/upload':
+        for _, file in request.files.items(multi=True):
+            discard_upload(file)
+
 # ============================================================================
 # STATIC FILE ROUTES
 # ============================================================================
@@ -82,10 +445,8 @@ def serve_thumbnail(filename):
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    session = Session()
     try:
-        photo_count = session.query(Photo).count()
-        session.close()
+        photo_count = get_photo_count()
         
         return jsonify({
             'status': 'healthy',
@@ -94,7 +455,6 @@ def health_check():
             'photos': photo_count
         })
     except Exception as e:
-        session.close()
         return jsonify({
             'status': 'unhealthy',
             'error': str(e)
@@ -110,12 +470,12 @@ def pipeline_status():
         }), 500
     
     try:
-        pipeline = get_pipeline()
-        stats = pipeline.get_processing_stats()
+        stats = PIPELINE.get_processing_stats()
         
         return jsonify({
             'ready': all(stats.values()),
-            'services': stats
+            'services': stats,
+            'step_timings': PIPELINE.get_step_timings()
         })
     except Exception as e:
         return jsonify({
@@ -145,15 +505,15 @@ def upload_photos():
         for file in files:
             if file.filename:
                 # Generate unique filename
-                timestamp = datetime.now().timestamp()
-                filename = f"{timestamp}_{file.filename}"
+                file_id = uuid.uuid4().hex
+                filename = f"{file_id}_{secure_filename(file.filename) or 'photo'}"
                 filepath = os.path.join(UPLOAD_FOLDER, filename)
                 
-                # Save file
-                file.save(filepath)
+                # Save file (already on disk; this is a rename)
+                store_upload(file, filepath)
                 
                 # Create database record
-                photo_id = f"photo_{timestamp}_{len(uploaded_photos)}"
+                photo_id = f"photo_{file_id}"
                 photo = Photo(
                     photo_id=photo_id,
                     filename=filename,
@@ -170,9 +530,19 @@ def upload_photos():
                 
                 logger.info(f"✓ Uploaded: {filename}")
         
+        bump_stats(session, total_photos=len(uploaded_photos))
         session.commit()
+        adjust_photo_count(len(uploaded_photos))
         logger.info(f"✓ Uploaded {len(uploaded_photos)} photos")
         
+        # Start analyzing now so /api/process mostly finds results waiting
+        if SERVICES_AVAILABLE:
+            for start in range(0, len(uploaded_photos), PIPELINE_BATCH_SIZE):
+                prefetch_queue.put([
+                    (photo['photo_id'], photo['path'])
+                    for photo in uploaded_photos[start:start + PIPELINE_BATCH_SIZE]
+                ])
+        
         return jsonify({
             'success': True,
             'photos_count': len(uploaded_photos),
@@ -188,9 +558,97 @@ def upload_photos():
 
 @app.route('/api/process', methods=['POST'])
 def process_photos():
+    """
+    Queue unprocessed photos for the vision pipeline and face clustering
+    
+    Returns 202 with a job_id immediately. Follow progress with Server-Sent
+    Events on /api/process/<job_id>/events, or poll /api/process/<job_id>.
+    """
+    if not SERVICES_AVAILABLE:
+        return jsonify({
+            'error': 'Vision services not available',
+            'message': 'Ensure services/ directory exists with all modules'
+        }), 500
+    
+    # Check if services are ready
+    stats = PIPELINE.get_processing_stats()
+    if not all(stats.values()):
+        return jsonify({
+            'error': 'Some services not ready',
+            'service_status': stats
+        }), 500
+    
+    job_id = uuid.uuid4().hex
+    with process_jobs_lock:
+        prune_finished_jobs()
+        process_jobs[job_id] = {
+            'status': 'queued',
+            'events': queue.Queue(),
+            'result': None,
+            'finished_at': None
+        }
+    process_job_queue.put(job_id)
+    
+    logger.info(f"✓ Queued processing job {job_id}")
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'events_url': f"/api/process/{job_id}/events"
+    }), 202
+
+@app.route('/api/process/<job_id>', methods=['GET'])
+def process_job_status(job_id):
+    """Get status (and the final result, once finished) of a processing job"""
+    job = process_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': job['status'],
+        'result': job['result']
+    })
+
+@app.route('/api/process/<job_id>/events', methods=['GET'])
+def process_job_events(job_id):
+    """
+    Stream a processing job's progress as Server-Sent Events
+    
+    Events: 'status', 'progress', then a final 'complete' or 'failed' whose
+    data is the same payload /api/process used to return synchronously
+    """
+    job = process_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def stream():
+        while True:
+            try:
+                event, data = job['events'].get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                if job['finished_at'] is not None:
+                    # Final event was already consumed (e.g. by an earlier listener)
+                    yield f"event: {job['status']}\ndata: {json.dumps(job['result'], default=str)}\n\n"
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+            if event in ('complete', 'failed'):
+                return
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def run_process_job(job_id):
     """
     Process photos through vision pipeline and face clustering
     
+    Runs on the process worker thread and publishes progress to the job.
+    
     Phase 2 Enhanced:
     - Face detection with quality scores
     - Emotion detection per face
@@ -199,288 +657,398 @@ def process_photos():
     - CLIP embeddings
     - Metadata extraction
     - Face clustering with emotions
-    """
-    if not SERVICES_AVAILABLE:
-        return jsonify({
-            'error': 'Vision services not available',
-            'message': 'Ensure services/ directory exists with all modules'
-        }), 500
     
+    Returns:
+        tuple: (result dict, status code)
+    """
+    job_photo_ids = []  # Prefetched results for these are dropped at the end
     try:
-        pipeline = get_pipeline()
-        face_service = get_face_service()
+        pipeline = PIPELINE
+        face_service = FACE_SERVICE
         session = Session()
         
-        # Check if services are ready
-        stats = pipeline.get_processing_stats()
-        if not all(stats.values()):
-            return jsonify({
-                'error': 'Some services not ready',
-                'service_status': stats
-            }), 500
+        # The whole job is one transaction. Don't wait for the WAL flush on
+        # commit: a crash can only lose the tail of the job, and those photos
+        # still have no CLIP embedding so the next run picks them up again.
+        session.execute(text("SET LOCAL synchronous_commit TO OFF"))
         
         # Get unprocessed photos (those without CLIP embeddings)
-        photos = session.query(Photo).filter(Photo.clip_embedding == None).all()
+        # Only the columns the loop reads; skip wide columns on the IS NULL scan
+        photos = session.query(Photo).options(
+            load_only(
+                Photo.photo_id, Photo.path, Photo.filename,
+                Photo.dominant_emotion, Photo.scene_type
+            ),
+            raiseload('*')
+        ).filter(Photo.clip_embedding == None).all()
+        job_photo_ids = [p.photo_id for p in photos]
         
         if not photos:
             session.close()
-            return jsonify({
+            return {
                 'message': 'No unprocessed photos found',
                 'clusters': []
-            }), 200
+            }, 200
         
         logger.info(f"========================================")
         logger.info(f"Processing {len(photos)} photos with vision pipeline")
         logger.info(f"========================================")
         
-        all_faces_data = []  # For clustering
+        # Face table for clustering, stored column-wise (one entry per face)
+        face_photo_ids = []
+        face_photo_paths = []
+        face_encodings = []  # one (N, 128) matrix per photo, rows in face order
+        face_locations = []
+        face_quality = []
+        face_emotions = []
+        object_rows = []  # DetectedObject rows, bulk inserted after the loop
         processed_count = 0
+        new_emotion_photos = 0  # Photos gaining a dominant emotion / scene
+        new_scene_photos = 0
         
         # =====================================================================
         # STEP 1: VISION PIPELINE - Analyze each photo
         # =====================================================================
         
-        for idx, photo in enumerate(photos):
-            logger.info(f"\n--- Photo {idx + 1}/{len(photos)}: {photo.filename} ---")
-            
-            if not os.path.exists(photo.path):
+        # Existence checks are stat-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=EXISTS_CHECK_WORKERS) as executor:
+            present = list(executor.map(os.path.exists, [p.path for p in photos]))
+        
+        existing_photos = []
+        for photo, is_present in zip(photos, present):
+            if not is_present:
                 logger.warning(f"File not found: {photo.path}")
                 continue
+            existing_photos.append(photo)
+        
+        # Photos still waiting for prefetch are analyzed below instead
+        drain_prefetch_queue()
+        
+        # Run full vision pipeline in chunks so YOLO/CLIP see batched inputs
+        batches = [
+            existing_photos[i:i + PIPELINE_BATCH_SIZE]
+            for i in range(0, len(existing_photos), PIPELINE_BATCH_SIZE)
+        ]
+        
+        def submit_batch(batch):
+            # Read ORM attributes here; only plain values cross to the worker thread
+            return pipeline_executor.submit(
+                analyze_photos,
+                pipeline,
+                [p.path for p in batch],
+                [p.photo_id for p in batch]
+            )
+        
+        # Analyze batch N+1 on the executor while this thread saves batch N
+        next_future = submit_batch(batches[0]) if batches else None
+        
+        for batch_idx, batch in enumerate(batches):
+            batch_start = batch_idx * PIPELINE_BATCH_SIZE
+            batch_results = next_future.result()
+            if batch_idx + 1 < len(batches):
+                next_future = submit_batch(batches[batch_idx + 1])
             
-            # Run full vision pipeline
-            result = pipeline.process_photo(photo.path, photo.photo_id)
-            
-            if not result.get('analysis_complete'):
-                logger.error(f"Pipeline failed: {result.get('error')}")
-                continue
-            
-            try:
-                # Update photo with vision analysis results
-                
-                # CLIP embedding (for semantic search in Phase 3)
-                if result.get('clip_embedding'):
-                    # Convert list back to numpy array for pgvector
-                    photo.clip_embedding = result['clip_embedding']
-                
-                # Scene classification
-                scene = result.get('scene', {})
-                photo.scene_type = scene.get('scene_type')
-                photo.location_type = scene.get('location')
-                photo.activity = scene.get('activity')
-                
-                # Caption
-                photo.caption = result.get('caption')
+            for offset, (photo, result) in enumerate(zip(batch, batch_results)):
+                idx = batch_start + offset
+                logger.debug("Photo %d/%d: %s", idx + 1, len(existing_photos), photo.filename)
                 
-                # Emotion aggregation
-                photo_emotion = result.get('photo_emotion', {})
-                photo.dominant_emotion = photo_emotion.get('dominant_emotion')
-                photo.mood_score = photo_emotion.get('mood_score')
+                if not result.get('analysis_complete'):
+                    logger.error("Pipeline failed for %s: %s", photo.filename, result.get('error'))
+                    continue
                 
-                # Metadata from EXIF
-                metadata = result.get('metadata', {})
-                if metadata.get('date_taken'):
-                    photo.date_taken = metadata['date_taken']
-                photo.season = metadata.get('season')
-                photo.time_of_day = metadata.get('time_of_day')
-                photo.camera_make = metadata.get('camera_make')
-                photo.camera_model = metadata.get('camera_model')
-                photo.image_quality = metadata.get('quality_score')
+                # Photos without a CLIP embedding are selected again next run;
+                # saving their faces and objects now would store them twice
+                if result.get('clip_embedding') is None:
+                    logger.warning("No CLIP embedding for %s, leaving it for the next run", photo.filename)
+                    continue
                 
-                # GPS coordinates
-                gps = metadata.get('gps')
-                if gps:
-                    photo.gps_latitude = gps.get('latitude')
-                    photo.gps_longitude = gps.get('longitude')
-                
-                # Save detected objects
-                for obj in result.get('objects', []):
-                    detected_obj = DetectedObject(
-                        photo_id=photo.photo_id,
-                        label=obj['label'],
-                        confidence=obj['confidence'],
-                        bbox_x1=obj['bbox']['x1'],
-                        bbox_y1=obj['bbox']['y1'],
-                        bbox_x2=obj['bbox']['x2'],
-                        bbox_y2=obj['bbox']['y2'],
-                        dominant_color_rgb=str(obj.get('dominant_color_rgb', '')),
-                        color_name=obj.get('color_name', '')
+                try:
+                    # Update photo with vision analysis results
+                    
+                    # CLIP embedding (for semantic search in Phase 3), already
+                    # fp16 (halfvec): half the bytes to write and scan
+                    photo.clip_embedding = result['clip_embedding']
+                    
+                    # Running totals only count photos that gain a value
+                    had_emotion = photo.dominant_emotion is not None
+                    had_scene = photo.scene_type is not None
+                    
+                    # Scene classification
+                    scene = result.get('scene', {})
+                    photo.scene_type = scene.get('scene_type')
+                    photo.location_type = scene.get('location')
+                    photo.activity = scene.get('activity')
+                    
+                    # Caption
+                    photo.caption = result.get('caption')
+                    
+                    # Emotion aggregation
+                    photo_emotion = result.get('photo_emotion', {})
+                    photo.dominant_emotion = photo_emotion.get('dominant_emotion')
+                    photo.mood_score = photo_emotion.get('mood_score')
+                    
+                    # Metadata from EXIF
+                    metadata = result.get('metadata', {})
+                    if metadata.get('date_taken'):
+                        photo.date_taken = metadata['date_taken']
+                    photo.season = metadata.get('season')
+                    photo.time_of_day = metadata.get('time_of_day')
+                    photo.camera_make = metadata.get('camera_make')
+                    photo.camera_model = metadata.get('camera_model')
+                    photo.image_quality = metadata.get('quality_score')
+                    
+                    # GPS coordinates
+                    gps = metadata.get('gps')
+                    if gps:
+                        photo.gps_latitude = gps.get('latitude')
+                        photo.gps_longitude = gps.get('longitude')
+                    
+                    # Save detected objects
+                    for obj in result.get('objects', []):
+                        object_rows.append({
+                            'photo_id': photo.photo_id,
+                            'label': obj['label'],
+                            'confidence': obj['confidence'],
+                            'bbox_x1': obj['bbox']['x1'],
+                            'bbox_y1': obj['bbox']['y1'],
+                            'bbox_x2': obj['bbox']['x2'],
+                            'bbox_y2': obj['bbox']['y2'],
+                            'dominant_color_rgb': str(obj.get('dominant_color_rgb', '')),
+                            'color_name': obj.get('color_name', '')
+                        })
+                    
+                    # Collect face data for clustering
+                    if result.get('faces'):
+                        face_encodings.append(result['face_encodings'])
+                    for face_data in result.get('faces', []):
+                        face_photo_ids.append(photo.photo_id)
+                        face_photo_paths.append(photo.path)
+                        face_locations.append(face_data['location'])
+                        face_quality.append(face_data.get('quality_score', 0.5))
+                        face_emotions.append(face_data.get('emotion') or {})
+                    
+                    new_emotion_photos += int(not had_emotion and photo.dominant_emotion is not None)
+                    new_scene_photos += int(not had_scene and photo.scene_type is not None)
+                    processed_count += 1
+                    logger.debug(
+                        "✓ Processed %s: %d faces, %d objects",
+                        photo.filename, len(result.get('faces', [])), len(result.get('objects', []))
                     )
-                    session.add(detected_obj)
-                
-                # Collect face data for clustering
-                for face_data in result.get('faces', []):
-                    all_faces_data.append({
-                        'photo_id': photo.photo_id,
-                        'photo_path': photo.path,
-                        'encoding': np.array(face_data['encoding']),
-                        'location': face_data['location'],
-                        'quality_score': face_data.get('quality_score', 0.5),
-                        'emotion': face_data.get('emotion', {})
-                    })
-                
-                processed_count += 1
-                logger.info(f"✓ Processed {photo.filename}: {len(result.get('faces', []))} faces, {len(result.get('objects', []))} objects")
-                
-            except Exception as e:
-                logger.error(f"Error saving data for {photo.filename}: {str(e)}")
-                continue
+                    
+                except Exception as e:
+                    logger.error("Error saving data for %s: %s", photo.filename, e)
+                    continue
+            
+            # Write this batch's photo updates and drop them from the identity
+            # map so memory stays flat on large libraries
+            session.flush()
+            for photo in batch:
+                session.expunge(photo)
+            
+            # One progress line per batch instead of several per photo
+            logger.info(
+                "Analyzed %d/%d photos (%d processed)",
+                batch_start + len(batch), len(existing_photos), processed_count
+            )
+            publish_job_event(job_id, 'progress', {
+                'stage': 'analyze',
+                'analyzed': batch_start + len(batch),
+                'total': len(existing_photos),
+                'processed': processed_count
+            })
         
-        # Commit photo updates and objects
-        session.commit()
+        # Write photo updates and objects (objects via COPY for large jobs);
+        # committed together with the clusters below
+        session.flush()
+        bulk_insert(session, DetectedObject, object_rows)
+        bump_stats(
+            session,
+            detected_objects=len(object_rows),
+            photos_with_emotions=new_emotion_photos,
+            photos_with_scenes=new_scene_photos
+        )
         logger.info(f"\n✓ Saved vision analysis for {processed_count} photos")
         
         # =====================================================================
         # STEP 2: FACE CLUSTERING
         # =====================================================================
         
-        if len(all_faces_data) == 0:
+        total_faces = len(face_photo_ids)
+        
+        if total_faces == 0:
+            session.commit()
             session.close()
             logger.warning("No faces detected in any photos")
-            return jsonify({
+            return {
                 'success': True,
                 'processed_photos': processed_count,
                 'total_faces': 0,
                 'clusters': [],
                 'message': 'Photos processed but no faces detected'
-            })
+            }, 200
+        
+        publish_job_event(job_id, 'progress', {'stage': 'cluster', 'total_faces': total_faces})
         
         logger.info(f"\n========================================")
-        logger.info(f"Clustering {len(all_faces_data)} faces")
+        logger.info(f"Clustering {total_faces} faces")
         logger.info(f"========================================")
         
-        # Extract encodings and quality scores
-        encodings = [face['encoding'] for face in all_faces_data]
-        quality_scores = [face['quality_score'] for face in all_faces_data]
+        # Encodings as one contiguous float32 matrix, quality as a vector
+        encodings = np.concatenate(face_encodings).astype(np.float32, copy=False)
+        # Stored as fp16 (halfvec); clustering keeps the float32 copy
+        stored_encodings = encodings.astype(np.float16)
+        quality = np.asarray(face_quality, dtype=np.float32)
         
-        # Cluster faces
-        labels = face_service.cluster_faces(encodings, quality_scores, min_samples=1, eps=0.6)
+        # Faces close to an existing person's centroid join that cluster;
+        # only the remainder is clustered from scratch
+        existing_ids, centroids = load_cluster_centroids(session)
+        labels = np.asarray(face_service.assign_to_clusters(encodings, centroids, eps=FACE_CLUSTER_EPS))
+        remainder = np.flatnonzero(labels == -1)
         
-        # Organize faces by cluster
-        clusters = {}
-        for idx, label in enumerate(labels):
-            if label == -1:  # Skip noise/outliers
-                logger.debug(f"Outlier face at index {idx}")
-                continue
-            
-            cluster_id = f"cluster_{label}"
-            
-            if cluster_id not in clusters:
-                clusters[cluster_id] = {
-                    'faces': [],
-                    'photos': set()
-                }
-            
-            clusters[cluster_id]['faces'].append(all_faces_data[idx])
-            clusters[cluster_id]['photos'].add(all_faces_data[idx]['photo_id'])
+        if len(remainder):
+            new_labels = np.asarray(face_service.cluster_faces(
+                encodings[remainder], quality[remainder], min_samples=1, eps=FACE_CLUSTER_EPS
+            ))
+            labels[remainder] = np.where(new_labels == -1, -1, new_labels + len(existing_ids))
+        
+        # New clusters are numbered after the highest existing cluster_N
+        next_number = next_cluster_number(session)
+        
+        def cluster_name(label):
+            if label < len(existing_ids):
+                return existing_ids[label]
+            return f"cluster_{next_number + label - len(existing_ids)}"
+        
+        # Group face indices by cluster label with one sort (noise/outliers = -1 skipped)
+        valid = np.flatnonzero(labels != -1)
+        order = valid[np.argsort(labels[valid], kind='stable')]
+        unique_labels, starts = np.unique(labels[order], return_index=True)
+        
+        clusters = {
+            cluster_name(label): face_indices
+            for label, face_indices in zip(unique_labels, np.split(order, starts[1:]))
+        }
+        existing_clusters = set(existing_ids)
         
-        logger.info(f"✓ Created {len(clusters)} person clusters")
+        logger.info(
+            f"✓ Assigned faces to {len(clusters)} person clusters "
+            f"({len(existing_clusters.intersection(clusters))} existing)"
+        )
         
         # Save clusters to database
-        for cluster_id, data in clusters.items():
+        cluster_rows = []
+        thumbnail_jobs = []  # (photo path, face location, output path)
+        face_rows = []
+        photo_cluster_links = set()
+        
+        for cluster_id, face_indices in clusters.items():
             # Find best quality face for thumbnail
-            best_face = max(data['faces'], key=lambda x: x['quality_score'])
+            best_idx = face_indices[np.argmax(quality[face_indices])]
             
-            logger.info(f"Cluster {cluster_id}: {len(data['faces'])} faces, best quality: {best_face['quality_score']:.2f}")
+            logger.debug(
+                "Cluster %s: %d faces, best quality: %.2f",
+                cluster_id, len(face_indices), face_quality[best_idx]
+            )
             
-            # Create thumbnail from best face
+            # Create thumbnail from best face (existing clusters keep theirs)
             thumbnail_filename = f"{cluster_id}_thumb.jpg"
             thumbnail_path = os.path.join(THUMBNAILS_FOLDER, thumbnail_filename)
             
-            face_service.extract_face_thumbnail(
-                best_face['photo_path'],
-                best_face['location'],
-                thumbnail_path
-            )
+            if cluster_id not in existing_clusters:
+                thumbnail_jobs.append((
+                    face_photo_paths[best_idx],
+                    face_locations[best_idx],
+                    thumbnail_path
+                ))
             
-            # Create or update cluster
-            cluster = session.query(Cluster).filter_by(cluster_id=cluster_id).first()
-            if not cluster:
-                cluster = Cluster(
-                    cluster_id=cluster_id,
-                    name=f"Person {cluster_id.split('_')[1]}",
-                    face_count=len(data['faces']),
-                    thumbnail=thumbnail_filename,
-                    created_at=time.time()
-                )
-                session.add(cluster)
-            else:
-                cluster.face_count = len(data['faces'])
-                cluster.thumbnail = thumbnail_filename
+            # Create or update cluster (upserted together after the loop)
+            cluster_rows.append({
+                'cluster_id': cluster_id,
+                'name': f"Person {cluster_id.split('_')[1]}",
+                'face_count': len(face_indices),
+                'thumbnail': thumbnail_filename,
+                'created_at': time.time()
+            })
             
-            # Save face embeddings with emotion and quality
-            for face_data in data['faces']:
-                face_embedding = FaceEmbedding(
-                    photo_id=face_data['photo_id'],
-                    cluster_id=cluster_id,
-                    embedding=face_data['encoding'].tobytes(),
-                    face_location=json.dumps(face_data['location']),
-                    emotion=face_data['emotion'].get('dominant_emotion'),
-                    emotion_confidence=face_data['emotion'].get('confidence'),
-                    emotion_valence=face_data['emotion'].get('valence'),
-                    quality_score=face_data['quality_score']
-                )
-                session.add(face_embedding)
+            # Collect face embeddings with emotion and quality
+            for idx in face_indices:
+                emotion = face_emotions[idx]
+                face_rows.append({
+                    'photo_id': face_photo_ids[idx],
+                    'cluster_id': cluster_id,
+                    'embedding': stored_encodings[idx],
+                    'face_location': list(face_locations[idx]),
+                    'emotion': emotion.get('dominant_emotion'),
+                    'emotion_confidence': emotion.get('confidence'),
+                    'emotion_valence': emotion.get('valence'),
+                    'quality_score': face_quality[idx]
+                })
                 
-                # Link photo to cluster (many-to-many)
-                photo_cluster = PhotoCluster(
-                    photo_id=face_data['photo_id'],
-                    cluster_id=cluster_id
-                )
-                session.add(photo_cluster)
+                # Link photo to cluster (many-to-many, one row per pair)
+                photo_cluster_links.add((face_photo_ids[idx], cluster_id))
         
+        # Write thumbnails, decoding each source photo once even when it
+        # holds the best face of several clusters
+        face_service.extract_face_thumbnails(thumbnail_jobs)
+        
+        # Clusters must exist before the bulk INSERTs that reference them.
+        # One upsert for all clusters; existing ones keep their (possibly
+        # renamed) name, creation time and thumbnail and gain the new faces.
+        if cluster_rows:
+            cluster_upsert = pg_insert(Cluster).values(cluster_rows)
+            session.execute(cluster_upsert.on_conflict_do_update(
+                index_elements=[Cluster.cluster_id],
+                set_={
+                    'face_count': func.coalesce(Cluster.face_count, 0) + cluster_upsert.excluded.face_count,
+                    'thumbnail': func.coalesce(Cluster.thumbnail, cluster_upsert.excluded.thumbnail)
+                }
+            ))
+        bulk_insert(session, FaceEmbedding, face_rows)
+        bump_stats(
+            session,
+            processed_faces=len(face_rows),
+            total_clusters=len(set(clusters) - existing_clusters)
+        )
+        # A link can already exist when a photo's faces join its existing cluster
+        if photo_cluster_links:
+            session.execute(pg_insert(PhotoCluster).values([
+                {'photo_id': photo_id, 'cluster_id': cluster_id}
+                for photo_id, cluster_id in photo_cluster_links
+            ]).on_conflict_do_nothing())
         session.commit()
         logger.info(f"✓ Saved all clusters and face embeddings")
         
-        # Get cluster info for response
-        clusters_list = session.query(Cluster).all()
-        cluster_info = []
-        
-        for cluster in clusters_list:
-            # Get photos for this cluster
-            photo_clusters = session.query(PhotoCluster).filter_by(
-                cluster_id=cluster.cluster_id
-            ).all()
-            
-            photos_in_cluster = []
-            for pc in photo_clusters:
-                p = session.query(Photo).filter_by(photo_id=pc.photo_id).first()
-                if p:
-                    photos_in_cluster.append({
-                        'photo_id': p.photo_id,
-                        'filename': p.filename,
-                        'path': p.filename  # Frontend expects filename
-                    })
-            
-            cluster_info.append({
-                'cluster_id': cluster.cluster_id,
-                'name': cluster.name,
-                'face_count': cluster.face_count,
-                'thumbnail': cluster.thumbnail,
-                'photos': photos_in_cluster
-            })
+        # Get cluster info for response (clusters and photos in one query)
+        cluster_info = cluster_listing(session)
         
         session.close()
         
         logger.info(f"\n========================================")
         logger.info(f"✓ Processing complete!")
         logger.info(f"  - Processed photos: {processed_count}")
-        logger.info(f"  - Total faces: {len(all_faces_data)}")
+        logger.info(f"  - Total faces: {total_faces}")
         logger.info(f"  - Person clusters: {len(clusters)}")
         logger.info(f"========================================\n")
         
-        return jsonify({
+        return {
             'success': True,
             'processed_photos': processed_count,
-            'total_faces': len(all_faces_data),
+            'total_faces': total_faces,
             'clusters': cluster_info,
             'total_clusters': len(clusters)
-        })
+        }, 200
         
     except Exception as e:
-        logger.error(f"Processing error: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return jsonify({'error': str(e)}), 500
+        # A failed flush/COPY leaves the thread's scoped session in an aborted
+        # transaction; roll back and release it before returning
+        Session.rollback()
+        Session.remove()
+        logger.exception(f"Processing error: {str(e)}", extra={'job_id': job_id})
+        return {'error': str(e)}, 500
+    
+    finally:
+        # Photos that failed or were skipped must not pin their results
+        discard_prefetched(job_photo_ids)
 
 @app.route('/api/clusters', methods=['GET'])
 def get_clusters():
@@ -488,32 +1056,8 @@ def get_clusters():
     session = Session()
     
     try:
-        clusters = session.query(Cluster).all()
-        cluster_list = []
-        
-        for cluster in clusters:
-            # Get photos for this cluster via junction table
-            photo_clusters = session.query(PhotoCluster).filter_by(
-                cluster_id=cluster.cluster_id
-            ).all()
-            
-            photos = []
-            for pc in photo_clusters:
-                photo = session.query(Photo).filter_by(photo_id=pc.photo_id).first()
-                if photo:
-                    photos.append({
-                        'photo_id': photo.photo_id,
-                        'filename': photo.filename,
-                        'path': photo.filename
-                    })
-            
-            cluster_list.append({
-                'cluster_id': cluster.cluster_id,
-                'name': cluster.name,
-                'face_count': cluster.face_count,
-                'thumbnail': cluster.thumbnail,
-                'photos': photos
-            })
+        # Clusters and their photos in a single round trip
+        cluster_list = cluster_listing(session)
         
         session.close()
         return jsonify({'clusters': cluster_list})
@@ -529,35 +1073,20 @@ def get_cluster_photos(cluster_id):
     session = Session()
     
     try:
-        # Get cluster info
-        cluster = session.query(Cluster).filter_by(cluster_id=cluster_id).first()
-        
-        if not cluster:
-            session.close()
-            return jsonify({'error': 'Cluster not found'}), 404
-        
-        # Get photos via junction table
-        photo_clusters = session.query(PhotoCluster).filter_by(
-            cluster_id=cluster_id
-        ).all()
-        
-        photos = []
-        for pc in photo_clusters:
-            photo = session.query(Photo).filter_by(photo_id=pc.photo_id).first()
-            if photo:
-                photos.append({
-                    'photo_id': photo.photo_id,
-                    'filename': photo.filename,
-                    'path': photo.filename
-                })
+        # Get cluster info together with its photos (one query)
+        listing = cluster_listing(session, cluster_id)
         
         session.close()
         
+        if not listing:
+            return jsonify({'error': 'Cluster not found'}), 404
+        
+        cluster = listing[0]
         return jsonify({
             'cluster_id': cluster_id,
-            'name': cluster.name,
-            'face_count': cluster.face_count,
-            'photos': photos
+            'name': cluster['name'],
+            'face_count': cluster['face_count'],
+            'photos': cluster['photos']
         })
         
     except Exception as e:
@@ -602,34 +1131,34 @@ def rename_cluster():
 def organize_photos():
     """
     Organize photos into folders by person/cluster
-    Photos with multiple people will be copied to multiple folders
+    Photos with multiple people will be linked into multiple folders
     """
     session = Session()
     
     try:
-        clusters = session.query(Cluster).all()
-        organized_count = 0
+        # One query for clusters, one IN (...) query for all their photos
+        clusters = session.query(Cluster).options(selectinload(Cluster.photos), raiseload('*')).all()
+        copy_jobs = {}  # dest_path -> src_path
         
         for cluster in clusters:
             # Create folder for this person
             person_folder = os.path.join(ORGANIZED_FOLDER, cluster.name)
             os.makedirs(person_folder, exist_ok=True)
             
-            # Get photos for this cluster
-            photo_clusters = session.query(PhotoCluster).filter_by(
-                cluster_id=cluster.cluster_id
-            ).all()
-            
-            for pc in photo_clusters:
-                photo = session.query(Photo).filter_by(photo_id=pc.photo_id).first()
-                if photo and os.path.exists(photo.path):
+            for photo in cluster.photos:
+                if os.path.exists(photo.path):
                     dest_path = os.path.join(person_folder, photo.filename)
                     if not os.path.exists(dest_path):  # Avoid duplicates
-                        shutil.copy2(photo.path, dest_path)
-                        organized_count += 1
+                        copy_jobs[dest_path] = photo.path
         
         session.close()
         
+        # Hard links are metadata-only; any copy fallbacks are disk-bound,
+        # so run them concurrently
+        with ThreadPoolExecutor(max_workers=ORGANIZE_COPY_WORKERS) as executor:
+            list(executor.map(link_file, copy_jobs.values(), copy_jobs.keys()))
+        organized_count = len(copy_jobs)
+        
         logger.info(f"✓ Organized {organized_count} photos into folders")
         
         return jsonify({
@@ -649,18 +1178,9 @@ def get_stats():
     session = Session()
     
     try:
-        stats = {
-            'total_photos': session.query(Photo).count(),
-            'total_clusters': session.query(Cluster).count(),
-            'processed_faces': session.query(FaceEmbedding).count(),
-            'detected_objects': session.query(DetectedObject).count(),
-            'photos_with_emotions': session.query(Photo).filter(
-                Photo.dominant_emotion != None
-            ).count(),
-            'photos_with_scenes': session.query(Photo).filter(
-                Photo.scene_type != None
-            ).count()
-        }
+        # Running totals maintained by upload/process (no table scans)
+        stats = dict.fromkeys(STATS_KEYS, 0)
+        stats.update(session.query(LibraryStat.key, LibraryStat.value).all())
         
         session.close()
         return jsonify(stats)
@@ -685,8 +1205,17 @@ def reset_database():
         session.query(DetectedObject).delete()
         session.query(Cluster).delete()
         session.query(Photo).delete()
+        session.query(LibraryStat).delete()
         session.commit()
         session.close()
+        adjust_photo_count()
+        
+        drain_prefetch_queue()
+        with prefetched_lock:
+            prefetched_results.clear()
+        
+        # Cached analyses belong to the photos just deleted
+        clear_cache()
         
         # Clear folders
         for folder in [UPLOAD_FOLDER, THUMBNAILS_FOLDER, ORGANIZED_FOLDER]:
@@ -707,6 +1236,14 @@ def reset_database():
         logger.error(f"Error resetting database: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+# Start the processing worker once all routes/helpers are defined
+process_worker = threading.Thread(target=process_worker_loop, name='process-worker', daemon=True)
+process_worker.start()
+
+# Analyze uploads in the background as they arrive
+prefetch_worker = threading.Thread(target=prefetch_worker_loop, name='prefetch-worker', daemon=True)
+prefetch_worker.start()
+
 # ============================================================================
 # MAIN
 # ============================================================================
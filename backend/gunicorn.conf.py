@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for the Lumeo backend
+
+One worker process, many threads: the CLIP / YOLO / DeepFace weights, the
+processing job state and the upload prefetch queue all live in that
+process, so every request shares a single copy of the models instead of
+each worker loading its own. The model calls release the GIL, so threads
+still overlap inference with request handling.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5002')}"
+
+# Each extra worker would load its own model copies (and its own job state)
+workers = 1
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# The worker loads and warms every model while importing app.py, before it
+# serves anything, and boot counts against this timeout. A cold start can
+# also build the YOLO / CLIP exports; run prepare_models.py beforehand (the
+# Render build does) so boot only loads cached files. With one worker, the
+# limit is generous rather than risk killing a slow boot and retrying forever.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '600'))
+
+# No preload_app: app.py starts its background threads at import, and
+# threads don't survive the fork into the worker
+preload_app = False
+
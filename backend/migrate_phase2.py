@@ -8,9 +8,154 @@ from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import os
 from dotenv import load_dotenv
 import sys
+import numpy as np
 
 load_dotenv()
 
+from models import engine, create_clip_index as build_clip_index, create_face_index as build_face_index
+
+
+def convert_face_embeddings(cursor):
+    """
+    Convert face_embeddings.embedding to pgvector halfvec(128) (fp16)
+    
+    Rows written before the pgvector switch hold float64 ndarray.tobytes()
+    output; they are decoded with numpy and rewritten. Columns already stored
+    as vector(128) are cast in place.
+    """
+    cursor.execute("""
+        SELECT udt_name
+        FROM information_schema.columns
+        WHERE table_name = 'face_embeddings' AND column_name = 'embedding'
+    """)
+    row = cursor.fetchone()
+    
+    if row and row[0] == 'bytea':
+        print("Converting face embeddings to halfvec(128)...")
+        cursor.execute("ALTER TABLE face_embeddings ADD COLUMN IF NOT EXISTS embedding_vec halfvec(128)")
+        
+        cursor.execute("SELECT embedding_id, embedding FROM face_embeddings")
+        rows = cursor.fetchall()
+        for embedding_id, raw in rows:
+            vec = np.frombuffer(bytes(raw), dtype=np.float64).astype(np.float32)
+            cursor.execute(
+                "UPDATE face_embeddings SET embedding_vec = %s::halfvec WHERE embedding_id = %s",
+                (vec.tolist(), embedding_id)
+            )
+        
+        cursor.execute("ALTER TABLE face_embeddings DROP COLUMN embedding")
+        cursor.execute("ALTER TABLE face_embeddings RENAME COLUMN embedding_vec TO embedding")
+        cursor.execute("ALTER TABLE face_embeddings ALTER COLUMN embedding SET NOT NULL")
+        print(f"  ✓ Converted {len(rows)} face embeddings")
+    elif row and row[0] == 'vector':
+        print("Converting face embeddings from vector(128) to halfvec(128)...")
+        cursor.execute("DROP INDEX IF EXISTS idx_faces_embedding")
+        cursor.execute(
+            "ALTER TABLE face_embeddings "
+            "ALTER COLUMN embedding TYPE halfvec(128) USING embedding::halfvec(128)"
+        )
+        print("  ✓ Converted face embeddings")
+    else:
+        print("  ⊙ Face embeddings already stored as halfvec (skipping)")
+    
+    create_face_index(cursor)
+
+def drop_non_hnsw_index(cursor, table, index_name):
+    """
+    Drop an older (ivfflat) vector index so it can be rebuilt as HNSW
+    
+    ivfflat lists are trained on whatever rows existed when the index was
+    built, while HNSW needs no training and stays accurate as rows are added.
+    
+    Returns:
+        bool: True if the index already uses HNSW and was kept
+    """
+    cursor.execute("""
+        SELECT indexdef FROM pg_indexes
+        WHERE tablename = %s AND indexname = %s
+    """, (table, index_name))
+    row = cursor.fetchone()
+    if row and 'hnsw' in row[0]:
+        return True
+    
+    cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    return False
+
+def create_face_index(cursor):
+    """
+    Build the HNSW L2 index on face_embeddings.embedding
+    
+    Replaces the ivfflat index from older migrations (lists=50 was trained
+    on the faces present at migration time); the build itself is
+    models.create_face_index, shared with init_db.
+    """
+    if drop_non_hnsw_index(cursor, 'face_embeddings', 'idx_faces_embedding'):
+        print("  ⊙ Face index already uses HNSW (skipping)")
+        return
+    
+    with engine.begin() as connection:
+        m, ef_construction = build_face_index(connection)
+    print(f"  ✓ Created HNSW index idx_faces_embedding (m={m}, ef_construction={ef_construction})")
+
+def convert_clip_embeddings(cursor):
+    """
+    Convert photos.clip_embedding from vector(512) to halfvec(512) (fp16)
+    
+    The old index is dropped first: an ivfflat vector_cosine_ops index
+    can't be rebuilt on a halfvec column, so the ALTER would fail.
+    create_clip_index builds the HNSW index afterwards.
+    """
+    cursor.execute("""
+        SELECT udt_name
+        FROM information_schema.columns
+        WHERE table_name = 'photos' AND column_name = 'clip_embedding'
+    """)
+    row = cursor.fetchone()
+    
+    if row and row[0] == 'vector':
+        print("Converting CLIP embeddings from vector(512) to halfvec(512)...")
+        cursor.execute("DROP INDEX IF EXISTS idx_photos_clip_embedding")
+        cursor.execute(
+            "ALTER TABLE photos "
+            "ALTER COLUMN clip_embedding TYPE halfvec(512) USING clip_embedding::halfvec(512)"
+        )
+        print("  ✓ Converted CLIP embeddings")
+    else:
+        print("  ⊙ CLIP embeddings already stored as halfvec (skipping)")
+
+def create_clip_index(cursor):
+    """
+    Build the HNSW cosine index on photos.clip_embedding
+    
+    An ivfflat index from older migrations is replaced; the build itself is
+    models.create_clip_index, shared with init_db.
+    """
+    if drop_non_hnsw_index(cursor, 'photos', 'idx_photos_clip_embedding'):
+        print("  ⊙ CLIP index already uses HNSW (skipping)")
+        return
+    
+    with engine.begin() as connection:
+        m, ef_construction = build_clip_index(connection)
+    print(f"  ✓ Created HNSW index idx_photos_clip_embedding (m={m}, ef_construction={ef_construction})")
+
+def split_statements(schema_sql):
+    """
+    Split a SQL script into statements
+    
+    Full-line '--' comments are removed before splitting, so a statement
+    that follows a section header still runs and a ';' inside a comment
+    doesn't cut a statement short. Only chunks that are empty once the
+    comments are gone are dropped.
+    
+    Args:
+        schema_sql: Script text (statements end with ';')
+    
+    Returns:
+        list: Statements without the trailing ';'
+    """
+    lines = [line for line in schema_sql.splitlines() if not line.strip().startswith('--')]
+    return [chunk.strip() for chunk in '\n'.join(lines).split(';') if chunk.strip()]
+
 def run_migration():
     """Apply Phase 2 schema changes"""
     
@@ -45,14 +190,10 @@ def run_migration():
         print()
         
         # Split by semicolon and execute each statement
-        statements = [s.strip() for s in schema_sql.split(';') if s.strip()]
+        statements = split_statements(schema_sql)
         
         for idx, statement in enumerate(statements, 1):
             try:
-                # Skip comments
-                if statement.startswith('--') or statement.startswith('COMMENT'):
-                    continue
-                
                 # Execute statement
                 cursor.execute(statement + ';')
                 
@@ -74,6 +215,15 @@ def run_migration():
                     print(f"  × Step {idx}: ERROR - {e}")
                     raise
         
+        print()
+        convert_face_embeddings(cursor)
+        convert_clip_embeddings(cursor)
+        create_clip_index(cursor)
+        
+        # Refresh planner statistics for the new columns and indexes
+        cursor.execute("ANALYZE photos, face_embeddings, photo_clusters, detected_objects")
+        print("  ✓ Analyzed tables")
+        
         print()
         print("=" * 60)
         print("Migration completed successfully!")
@@ -3,11 +3,11 @@ SQLAlchemy Models for Lumeo - Phase 2 Enhanced
 Includes all vision intelligence features
 """
 
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Text, ForeignKey, LargeBinary
+from sqlalchemy import create_engine, text, Column, String, Integer, BigInteger, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.dialects.postgresql import JSON
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import sessionmaker, scoped_session, relationship
+from sqlalchemy.dialects.postgresql import JSON, JSONB
+from pgvector.sqlalchemy import HALFVEC
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -23,9 +23,29 @@ DB_PORT = os.getenv('DB_PORT', '5432')
 
 DATABASE_URL = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
+# HNSW build settings for the vector indexes (unset = scale with the row count)
+HNSW_M = os.getenv('HNSW_M')
+HNSW_EF_CONSTRUCTION = os.getenv('HNSW_EF_CONSTRUCTION')
+HNSW_MAINTENANCE_WORK_MEM = os.getenv('HNSW_MAINTENANCE_WORK_MEM', '2GB')
+HNSW_PARALLEL_WORKERS = int(os.getenv('HNSW_PARALLEL_WORKERS', '7'))
+
+# Connection pool (default QueuePool is 5 + 10 overflow; search requests and
+# the processing job contend for it under load)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '20'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '40'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # seconds
+
 # Create engine and session
-engine = create_engine(DATABASE_URL, echo=False)
-Session = sessionmaker(bind=engine)
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,  # drop connections the server closed while idle
+    pool_recycle=DB_POOL_RECYCLE
+)
+# Thread-local session registry; Flask removes it at request teardown
+Session = scoped_session(sessionmaker(bind=engine))
 Base = declarative_base()
 
 
@@ -40,7 +60,7 @@ class Photo(Base):
     upload_date = Column(Float, nullable=False)
     
     # Phase 2: Vision Intelligence
-    clip_embedding = Column(Vector(512))  # CLIP embedding for semantic search
+    clip_embedding = Column(HALFVEC(512))  # fp16 CLIP embedding for semantic search
     scene_type = Column(String(20))  # indoor/outdoor
     location_type = Column(String(50))  # beach, office, home, etc. (matches DB column)
     activity = Column(String(50))  # sports, dining, party, etc.
@@ -68,11 +88,16 @@ class Photo(Base):
     dominant_emotion = Column(String(20))  # Overall photo emotion
     mood_score = Column(Float)  # -1 (negative) to +1 (positive)
     
-    # Relationships
+    # Relationships (lazy per row; list queries use selectinload and raiseload('*'))
     face_embeddings = relationship('FaceEmbedding', back_populates='photo', cascade='all, delete-orphan')
     photo_clusters = relationship('PhotoCluster', back_populates='photo', cascade='all, delete-orphan')
     detected_objects = relationship('DetectedObject', back_populates='photo', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Partial index: only unprocessed photos (no CLIP embedding yet)
+        Index('ix_photos_unprocessed', 'photo_id', postgresql_where=clip_embedding.is_(None)),
+    )
+    
     def __repr__(self):
         return f"<Photo(id={self.photo_id}, filename={self.filename}, scene={self.scene_type})>"
 
@@ -90,6 +115,8 @@ class Cluster(Base):
     # Relationships
     face_embeddings = relationship('FaceEmbedding', back_populates='cluster', cascade='all, delete-orphan')
     photo_clusters = relationship('PhotoCluster', back_populates='cluster', cascade='all, delete-orphan')
+    # Read-only shortcut through photo_clusters (use selectinload to avoid N+1)
+    photos = relationship('Photo', secondary='photo_clusters', viewonly=True)
     
     def __repr__(self):
         return f"<Cluster(id={self.cluster_id}, name={self.name}, faces={self.face_count})>"
@@ -102,8 +129,8 @@ class FaceEmbedding(Base):
     embedding_id = Column(Integer, primary_key=True, autoincrement=True)
     photo_id = Column(String(255), ForeignKey('photos.photo_id', ondelete='CASCADE'))
     cluster_id = Column(String(255), ForeignKey('clusters.cluster_id', ondelete='CASCADE'))
-    embedding = Column(LargeBinary, nullable=False)  # Face encoding
-    face_location = Column(Text)  # JSON string of (top, right, bottom, left)
+    embedding = Column(HALFVEC(128), nullable=False)  # fp16 face encoding (pgvector halfvec)
+    face_location = Column(JSONB)  # [top, right, bottom, left]
     
     # Phase 2: Emotion Analysis
     emotion = Column(String(20))  # happy, sad, angry, surprise, neutral, fear, disgust
@@ -113,9 +140,16 @@ class FaceEmbedding(Base):
     # Phase 2: Quality Assessment
     quality_score = Column(Float)  # 0-1 face quality score
     
-    # Relationships
-    photo = relationship('Photo', back_populates='face_embeddings')
-    cluster = relationship('Cluster', back_populates='face_embeddings')
+    # Relationships (many-to-one side raises on lazy load: join or
+    # selectinload from the query instead of touching it in a loop)
+    photo = relationship('Photo', back_populates='face_embeddings', lazy='raise')
+    cluster = relationship('Cluster', back_populates='face_embeddings', lazy='raise')
+    
+    __table_args__ = (
+        # Foreign keys aren't indexed automatically in PostgreSQL
+        Index('ix_face_embeddings_photo', 'photo_id'),
+        Index('ix_face_embeddings_cluster', 'cluster_id'),
+    )
     
     def __repr__(self):
         return f"<FaceEmbedding(id={self.embedding_id}, emotion={self.emotion}, quality={self.quality_score})>"
@@ -128,9 +162,14 @@ class PhotoCluster(Base):
     photo_id = Column(String(255), ForeignKey('photos.photo_id', ondelete='CASCADE'), primary_key=True)
     cluster_id = Column(String(255), ForeignKey('clusters.cluster_id', ondelete='CASCADE'), primary_key=True)
     
-    # Relationships
-    photo = relationship('Photo', back_populates='photo_clusters')
-    cluster = relationship('Cluster', back_populates='photo_clusters')
+    # Relationships (raise on lazy load, as on FaceEmbedding)
+    photo = relationship('Photo', back_populates='photo_clusters', lazy='raise')
+    cluster = relationship('Cluster', back_populates='photo_clusters', lazy='raise')
+    
+    __table_args__ = (
+        # PK leads with photo_id; cluster lookups need cluster_id first
+        Index('ix_photo_clusters_cluster', 'cluster_id', 'photo_id'),
+    )
     
     def __repr__(self):
         return f"<PhotoCluster(photo={self.photo_id}, cluster={self.cluster_id})>"
@@ -159,17 +198,95 @@ class DetectedObject(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Relationship
-    photo = relationship('Photo', back_populates='detected_objects')
+    # Relationship (raise on lazy load, as on FaceEmbedding)
+    photo = relationship('Photo', back_populates='detected_objects', lazy='raise')
     
     def __repr__(self):
         return f"<DetectedObject(id={self.object_id}, label={self.label}, confidence={self.confidence:.2f})>"
 
 
+class LibraryStat(Base):
+    """Running totals for /api/stats, updated in the same transaction as the rows they count"""
+    __tablename__ = 'library_stats'
+    
+    key = Column(String(50), primary_key=True)  # total_photos, processed_faces, ...
+    value = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<LibraryStat({self.key}={self.value})>"
+
+
+def hnsw_params(row_count):
+    """
+    HNSW (m, ef_construction) for a table of row_count vectors
+    
+    HNSW_M / HNSW_EF_CONSTRUCTION override the size-based defaults.
+    """
+    if row_count < 100_000:
+        m, ef_construction = 16, 64
+    elif row_count < 1_000_000:
+        m, ef_construction = 24, 100
+    else:
+        m, ef_construction = 32, 128
+    
+    return int(HNSW_M or m), int(HNSW_EF_CONSTRUCTION or ef_construction)
+
+
+def create_clip_index(connection):
+    """
+    Create the HNSW cosine index on photos.clip_embedding if it's missing
+    
+    Args:
+        connection: Open SQLAlchemy connection (inside a transaction)
+    
+    Returns:
+        tuple: (m, ef_construction) the index is built with
+    """
+    photo_count = connection.execute(text("SELECT count(*) FROM photos")).scalar()
+    m, ef_construction = hnsw_params(photo_count)
+    
+    # Building HNSW in memory with parallel workers is much faster than
+    # spilling to disk; SET LOCAL keeps it to this transaction
+    connection.execute(text(f"SET LOCAL maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}'"))
+    connection.execute(text(f"SET LOCAL max_parallel_maintenance_workers = {HNSW_PARALLEL_WORKERS}"))
+    connection.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_photos_clip_embedding ON photos
+        USING hnsw (clip_embedding halfvec_cosine_ops)
+        WITH (m = {m}, ef_construction = {ef_construction})
+    """))
+    return m, ef_construction
+
+
+def create_face_index(connection):
+    """
+    Create the HNSW L2 index on face_embeddings.embedding if it's missing
+    
+    Args:
+        connection: Open SQLAlchemy connection (inside a transaction)
+    
+    Returns:
+        tuple: (m, ef_construction) the index is built with
+    """
+    face_count = connection.execute(text("SELECT count(*) FROM face_embeddings")).scalar()
+    m, ef_construction = hnsw_params(face_count)
+    
+    connection.execute(text(f"SET LOCAL maintenance_work_mem = '{HNSW_MAINTENANCE_WORK_MEM}'"))
+    connection.execute(text(f"SET LOCAL max_parallel_maintenance_workers = {HNSW_PARALLEL_WORKERS}"))
+    connection.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_faces_embedding ON face_embeddings
+        USING hnsw (embedding halfvec_l2_ops)
+        WITH (m = {m}, ef_construction = {ef_construction})
+    """))
+    return m, ef_construction
+
+
 # Create all tables (if they don't exist)
 def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and the vector indexes"""
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_clip_index(connection)
+        create_face_index(connection)
     print("✓ Database tables initialized")
 
 
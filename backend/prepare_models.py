@@ -0,0 +1,39 @@
+"""
+Model Preparation Script
+Build the one-time model exports before the server starts
+
+Loading the services builds anything not cached yet: the YOLO TensorRT
+engine (CUDA) or INT8 OpenVINO model (CPU), and the int8 ONNX CLIP image
+tower (CPU). These exports can take minutes, longer than a gunicorn worker
+may spend booting, so run this at build / pre-start time:
+
+    python prepare_models.py
+"""
+
+import sys
+
+from services.object_service import get_object_service
+from services.clip_service import get_clip_service
+
+
+def prepare_models():
+    """
+    Load YOLO and CLIP once so their exports are written to disk
+
+    Returns:
+        bool: True if both models loaded
+    """
+    print("Preparing YOLO...")
+    object_service = get_object_service()
+    print(f"  {'✓' if object_service.model is not None else '×'} YOLO")
+
+    print("Preparing CLIP...")
+    clip_service = get_clip_service()
+    print(f"  {'✓' if clip_service.model is not None else '×'} CLIP"
+          f"{' (ONNX Runtime)' if clip_service.onnx_session is not None else ''}")
+
+    return object_service.model is not None and clip_service.model is not None
+
+
+if __name__ == '__main__':
+    sys.exit(0 if prepare_models() else 1)
@@ -10,7 +10,7 @@ ADD COLUMN IF NOT EXISTS quality_score FLOAT;
 
 -- 2. Add CLIP embedding and metadata to photos
 ALTER TABLE photos
-ADD COLUMN IF NOT EXISTS clip_embedding vector(512),
+ADD COLUMN IF NOT EXISTS clip_embedding halfvec(512),
 ADD COLUMN IF NOT EXISTS scene_type VARCHAR(20),
 ADD COLUMN IF NOT EXISTS location_type VARCHAR(50),
 ADD COLUMN IF NOT EXISTS activity VARCHAR(50),
@@ -26,6 +26,9 @@ ADD COLUMN IF NOT EXISTS caption TEXT,
 ADD COLUMN IF NOT EXISTS dominant_emotion VARCHAR(20),
 ADD COLUMN IF NOT EXISTS mood_score FLOAT;
 
+-- 2b. CLIP embeddings are stored as fp16 (halfvec). Older vector(512)
+--     columns are converted (and re-indexed) by migrate_phase2.py
+
 -- 3. Create detected_objects table
 CREATE TABLE IF NOT EXISTS detected_objects (
     object_id SERIAL PRIMARY KEY,
@@ -50,10 +53,8 @@ CREATE INDEX IF NOT EXISTS idx_objects_label ON detected_objects(label);
 -- 6. Create index on color for color searches
 CREATE INDEX IF NOT EXISTS idx_objects_color ON detected_objects(color_name);
 
--- 7. Create vector index for CLIP embeddings (for similarity search)
-CREATE INDEX IF NOT EXISTS idx_photos_clip_embedding ON photos 
-USING ivfflat (clip_embedding vector_cosine_ops)
-WITH (lists = 100);
+-- 7. Vector index for CLIP embeddings: built by migrate_phase2.py
+--    (HNSW, parameters scaled to the photo count)
 
 -- 8. Create indexes for common search patterns
 CREATE INDEX IF NOT EXISTS idx_photos_date_taken ON photos(date_taken);
@@ -66,11 +67,42 @@ CREATE INDEX IF NOT EXISTS idx_photos_mood ON photos(mood_score);
 -- 9. Create index for face emotions
 CREATE INDEX IF NOT EXISTS idx_faces_emotion ON face_embeddings(emotion);
 
--- 10. Add comments for documentation
-COMMENT ON COLUMN photos.clip_embedding IS 'CLIP image embedding for semantic search';
+-- 9b. Partial index for the "unprocessed photos" query in /api/process
+CREATE INDEX IF NOT EXISTS ix_photos_unprocessed ON photos(photo_id)
+WHERE clip_embedding IS NULL;
+
+-- 9c. Cluster -> photos lookups (PK is (photo_id, cluster_id))
+CREATE INDEX IF NOT EXISTS ix_photo_clusters_cluster ON photo_clusters(cluster_id, photo_id);
+
+-- 9d. Face lookups by photo (cascading deletes) and by cluster (centroids)
+CREATE INDEX IF NOT EXISTS ix_face_embeddings_photo ON face_embeddings(photo_id);
+CREATE INDEX IF NOT EXISTS ix_face_embeddings_cluster ON face_embeddings(cluster_id);
+
+-- 10. Store face locations as JSONB so they can be queried
+ALTER TABLE face_embeddings
+ALTER COLUMN face_location TYPE JSONB USING face_location::jsonb;
+
+-- 10b. Running totals for /api/stats (recounted whenever the migration runs)
+CREATE TABLE IF NOT EXISTS library_stats (
+    key VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO library_stats (key, value)
+SELECT 'total_photos', COUNT(*) FROM photos
+UNION ALL SELECT 'total_clusters', COUNT(*) FROM clusters
+UNION ALL SELECT 'processed_faces', COUNT(*) FROM face_embeddings
+UNION ALL SELECT 'detected_objects', COUNT(*) FROM detected_objects
+UNION ALL SELECT 'photos_with_emotions', COUNT(*) FROM photos WHERE dominant_emotion IS NOT NULL
+UNION ALL SELECT 'photos_with_scenes', COUNT(*) FROM photos WHERE scene_type IS NOT NULL
+ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value;
+
+-- 11. Add comments for documentation
+COMMENT ON COLUMN photos.clip_embedding IS 'CLIP image embedding (fp16) for semantic search';
 COMMENT ON COLUMN photos.scene_type IS 'Indoor/outdoor classification';
 COMMENT ON COLUMN photos.location_type IS 'Specific location (beach, office, home, etc.)';
 COMMENT ON COLUMN photos.activity IS 'Activity detected (sports, dining, party, etc.)';
 COMMENT ON COLUMN photos.caption IS 'Auto-generated natural language caption';
 COMMENT ON COLUMN photos.mood_score IS 'Overall mood score from -1 (negative) to +1 (positive)';
-COMMENT ON TABLE detected_objects IS 'Objects detected by YOLO in photos';
\ No newline at end of file
+COMMENT ON TABLE detected_objects IS 'Objects detected by YOLO in photos';
+COMMENT ON TABLE library_stats IS 'Running totals served by /api/stats';
\ No newline at end of file
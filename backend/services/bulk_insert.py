@@ -0,0 +1,91 @@
+"""
+Bulk Insert - PostgreSQL COPY for large row batches
+Used by the processing job for face embeddings and detected objects
+"""
+
+import csv
+import io
+import json
+import logging
+
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy.dialects.postgresql import JSON, JSONB
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Below this many rows a multi-row INSERT is as fast and skips the CSV encode
+BULK_COPY_MIN_ROWS = 100
+
+# NULL marker in the COPY stream (keeps '' as an empty string)
+COPY_NULL = '\\N'
+
+
+def _copy_value(column, value):
+    """Text form of one value as COPY expects it for the column's type"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(column.type, HALFVEC):
+        return '[' + ','.join(str(float(v)) for v in value) + ']'
+    if isinstance(column.type, (JSON, JSONB)):
+        return json.dumps(value)
+    return value
+
+
+def bulk_insert(session, model, rows, min_copy_rows=BULK_COPY_MIN_ROWS):
+    """
+    Insert many rows of a model, with COPY once the batch is large enough
+
+    COPY streams all rows in one statement instead of per-row INSERTs.
+    It runs on the session's own connection, so the rows are part of the
+    current transaction and commit or roll back with it. Python-side column
+    defaults (e.g. created_at) are filled in; autoincrement keys are left
+    to the database.
+
+    Args:
+        session: Database session
+        model: Mapped class (FaceEmbedding, DetectedObject, ...)
+        rows: List of dicts keyed by column name, all with the same keys
+        min_copy_rows: Smaller batches go through bulk_insert_mappings
+
+    Returns:
+        int: Number of rows inserted
+    """
+    if len(rows) < min_copy_rows:
+        session.bulk_insert_mappings(model, rows)
+        return len(rows)
+
+    table = model.__table__
+    keys = list(rows[0].keys())
+    defaults = [
+        column for column in table.columns
+        if column.name not in keys and column.default is not None and not column.default.is_sequence
+    ]
+    columns = [table.columns[key] for key in keys] + defaults
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = [_copy_value(table.columns[key], row[key]) for key in keys]
+        for column in defaults:
+            default = column.default.arg(None) if column.default.is_callable else column.default.arg
+            values.append(_copy_value(column, default))
+        writer.writerow(values)
+    buffer.seek(0)
+
+    # Pending ORM writes (e.g. parent rows) must reach the database first
+    session.flush()
+
+    column_list = ', '.join(column.name for column in columns)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+    logger.info(f"Copied {len(rows)} rows into {table.name}")
+
+    return len(rows)
@@ -6,42 +6,159 @@ Phase 2.6
 import torch
 from transformers import CLIPProcessor, CLIPModel
 from PIL import Image
+from sqlalchemy import select, text as sql_text
 import numpy as np
+import functools
 import logging
+import os
+from pathlib import Path
+
+from .meta_cache import content_key, cache_get, cache_put
+
+try:
+    import onnxruntime
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+except ImportError:  # optional; CPU deployments fall back to PyTorch
+    onnxruntime = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Text query embeddings kept in memory (512 float32 = 2 KB each)
+TEXT_EMBEDDING_CACHE_SIZE = 1024
+
 
 class CLIPService:
     """Handle CLIP embeddings for images and text"""
     
-    def __init__(self, model_name='openai/clip-vit-base-patch32'):
+    def __init__(self, model_name='openai/clip-vit-base-patch32', compile_model=None, use_onnx=None):
         """
         Initialize CLIP model
         
+        Weights are fp16 on CUDA. On CPU they stay fp32 unless LUMEO_CLIP_BF16=1
+        (bf16 only pays off on CPUs with native bf16 matmul, e.g. AMX).
+        
         Args:
             model_name: HuggingFace model name for CLIP
+            compile_model: torch.compile the image tower (defaults to the
+                LUMEO_TORCH_COMPILE env var; on for CUDA, off for CPU)
+            use_onnx: On CPU, run the image tower through an int8 ONNX Runtime
+                session (defaults to the LUMEO_CLIP_ONNX env var, on unless '0')
         """
+        self.onnx_session = None
+        self.model_name = model_name
+        # Own CUDA stream, so image batches encoded on the pipeline's CLIP
+        # thread overlap YOLO's kernels instead of queueing behind them
+        self.stream = None
+        
+        if use_onnx is None:
+            use_onnx = os.getenv('LUMEO_CLIP_ONNX', '1') != '0'
+        
         try:
             logger.info(f"Loading CLIP model: {model_name}")
             
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
             logger.info(f"Using device: {self.device}")
             
-            self.model = CLIPModel.from_pretrained(model_name).to(self.device)
+            if self.device == "cuda":
+                self.dtype = torch.float16
+                self.stream = torch.cuda.Stream()
+            elif os.getenv('LUMEO_CLIP_BF16', '0') == '1':
+                self.dtype = torch.bfloat16
+            else:
+                self.dtype = torch.float32
+            
+            self.model = CLIPModel.from_pretrained(model_name, torch_dtype=self.dtype).to(self.device)
             self.processor = CLIPProcessor.from_pretrained(model_name)
             
             # Set to evaluation mode
             self.model.eval()
             
-            logger.info("CLIP model loaded successfully")
+            if compile_model is None:
+                compile_model = os.getenv('LUMEO_TORCH_COMPILE', '1' if self.device == "cuda" else '0') != '0'
+            if compile_model:
+                # Fuse the image tower's attention/MLP kernels (compiled on warm-up)
+                self.model.get_image_features = torch.compile(
+                    self.model.get_image_features, mode='reduce-overhead', fullgraph=False
+                )
+            
+            logger.info(f"CLIP model loaded successfully ({self.dtype}, compiled={compile_model})")
+            
+            if use_onnx and onnxruntime is not None and self.dtype == torch.float32 and self.device == "cpu":
+                self._load_onnx_session(model_name)
             
         except Exception as e:
             logger.error(f"Failed to load CLIP model: {str(e)}")
             self.model = None
             self.processor = None
     
+    def _load_onnx_session(self, model_name):
+        """
+        Run the image tower through ONNX Runtime instead of eager PyTorch
+        
+        The tower is exported once, dynamically quantized to int8 and cached
+        in the working directory (openai/clip-vit-base-patch32 ->
+        openai_clip-vit-base-patch32_vision.int8.onnx). Any failure keeps the
+        PyTorch model.
+        
+        Args:
+            model_name: HuggingFace model name for CLIP
+        """
+        base_name = model_name.replace('/', '_')
+        onnx_path = Path(f"{base_name}_vision.onnx")
+        quantized_path = Path(f"{base_name}_vision.int8.onnx")
+        
+        try:
+            if not quantized_path.exists():
+                logger.info(f"Exporting CLIP image tower to ONNX: {onnx_path}")
+                torch.onnx.export(
+                    _ImageTower(self.model),
+                    torch.zeros((1, 3, 224, 224)),
+                    str(onnx_path),
+                    input_names=['pixel_values'],
+                    output_names=['image_embeds'],
+                    dynamic_axes={'pixel_values': {0: 'batch'}, 'image_embeds': {0: 'batch'}},
+                    opset_version=17
+                )
+                quantize_dynamic(str(onnx_path), str(quantized_path), weight_type=QuantType.QInt8)
+                onnx_path.unlink()
+            
+            # OpenVINO when the build ships it, else the default CPU provider
+            providers = [
+                provider for provider in ('OpenVINOExecutionProvider', 'CPUExecutionProvider')
+                if provider in onnxruntime.get_available_providers()
+            ]
+            self.onnx_session = onnxruntime.InferenceSession(str(quantized_path), providers=providers)
+            logger.info(f"Using ONNX Runtime for CLIP images: {quantized_path} ({providers[0]})")
+            
+        except Exception as e:
+            logger.warning(f"ONNX Runtime unavailable, using PyTorch model: {str(e)}")
+            self.onnx_session = None
+    
+    def warm_up(self):
+        """
+        Run one dummy forward pass so CUDA context creation and cuDNN
+        autotuning happen at startup rather than on the first request
+        """
+        if self.model is None:
+            return
+        
+        try:
+            if self.device == "cuda":
+                torch.backends.cudnn.benchmark = True
+            
+            dummy = torch.zeros((1, 3, 224, 224), device=self.device, dtype=self.dtype)
+            if self.onnx_session is not None:
+                self.onnx_session.run(None, {'pixel_values': dummy.numpy()})
+            else:
+                with torch.inference_mode():
+                    self.model.get_image_features(pixel_values=dummy)
+            
+            logger.info("CLIP model warmed up")
+            
+        except Exception as e:
+            logger.warning(f"CLIP warm-up failed: {str(e)}")
+    
     def encode_image(self, image_path):
         """
         Generate CLIP embedding for an image
@@ -56,35 +173,109 @@ class CLIPService:
             logger.error("CLIP model not loaded")
             return None
         
-        try:
-            logger.info(f"Encoding image: {image_path}")
-            
-            # Load and process image
-            image = Image.open(image_path).convert('RGB')
-            inputs = self.processor(images=image, return_tensors="pt").to(self.device)
-            
-            # Generate embedding
-            with torch.no_grad():
-                image_features = self.model.get_image_features(**inputs)
-            
-            # Normalize embedding
-            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-            
-            # Convert to numpy array
-            embedding = image_features.cpu().numpy().flatten()
-            
+        logger.info(f"Encoding image: {image_path}")
+        
+        # A batch of one: same preprocessing, precision and normalization
+        embedding = self.encode_images([image_path])[0]
+        
+        if embedding is not None:
             logger.info(f"Generated embedding with shape: {embedding.shape}")
+        
+        return embedding
+    
+    def encode_images(self, image_paths, batch_size=32, images=None):
+        """
+        Generate CLIP embeddings for several images, batch_size per forward pass
+        
+        Args:
+            image_paths: List of image file paths
+            batch_size: Images per forward pass
+            images: Optional RGB arrays already decoded from image_paths
+                (None entries are skipped)
+        
+        Returns:
+            list: 512-dimensional embedding per path (None where the image failed)
+        """
+        if self.model is None or self.processor is None:
+            logger.error("CLIP model not loaded")
+            return [None] * len(image_paths)
+        
+        embeddings = [None] * len(image_paths)
+        
+        # Files with identical contents (re-uploads, re-processing) reuse
+        # their stored embedding; only the rest go through the encoder
+        keys = [content_key('clip', path, self.model_name) for path in image_paths]
+        pending = []
+        for idx, key in enumerate(keys):
+            hit, embedding = cache_get(key)
+            if hit:
+                embeddings[idx] = embedding.astype(np.float32)
+            else:
+                pending.append(idx)
+        
+        for start in range(0, len(pending), batch_size):
+            # Load images, remembering which ones could be decoded
+            batch_images = []
+            loaded_idx = []
+            for idx in pending[start:start + batch_size]:
+                if images is not None:
+                    if images[idx] is not None:
+                        batch_images.append(images[idx])
+                        loaded_idx.append(idx)
+                    continue
+                try:
+                    batch_images.append(Image.open(image_paths[idx]).convert('RGB'))
+                    loaded_idx.append(idx)
+                except Exception as e:
+                    logger.error(f"Error loading image {image_paths[idx]}: {str(e)}")
             
-            return embedding
+            if not batch_images:
+                continue
             
-        except Exception as e:
-            logger.error(f"Error encoding image: {str(e)}")
-            return None
+            try:
+                logger.info(f"Encoding batch of {len(batch_images)} images")
+                
+                inputs = self.processor(images=batch_images, return_tensors="pt")
+                
+                # Upload, forward pass and download all on this service's
+                # stream (a no-op context on CPU, where self.stream is None)
+                with torch.cuda.stream(self.stream):
+                    if self.device == "cuda":
+                        # Pinned host memory lets the copy overlap with queued GPU work
+                        inputs['pixel_values'] = inputs['pixel_values'].pin_memory().to(self.device, non_blocking=True)
+                    
+                    # Single batched forward pass in the model's precision
+                    if self.onnx_session is not None:
+                        image_features = torch.from_numpy(self.onnx_session.run(
+                            None, {'pixel_values': inputs['pixel_values'].numpy()}
+                        )[0])
+                    else:
+                        inputs['pixel_values'] = inputs['pixel_values'].to(self.dtype)
+                        with torch.inference_mode():
+                            image_features = self.model.get_image_features(**inputs)
+                    
+                    # Normalize embeddings in fp32
+                    image_features = image_features.float()
+                    image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+                    batch = image_features.cpu().numpy()
+                
+                for row, idx in enumerate(loaded_idx):
+                    embeddings[idx] = batch[row]
+                    # fp16, the same precision the halfvec column stores
+                    cache_put(keys[idx], batch[row].astype(np.float16))
+                
+            except Exception as e:
+                logger.error(f"Error encoding image batch: {str(e)}")
+        
+        return embeddings
     
     def encode_text(self, text):
         """
         Generate CLIP embedding for text query
         
+        Results are cached per text (LRU, TEXT_EMBEDDING_CACHE_SIZE entries),
+        since search queries repeat a lot.
+        
         Args:
             text: Text string to encode
         
@@ -96,29 +287,36 @@ class CLIPService:
             return None
         
         try:
-            logger.info(f"Encoding text: {text}")
-            
-            # Process text
-            inputs = self.processor(text=[text], return_tensors="pt", padding=True).to(self.device)
-            
-            # Generate embedding
-            with torch.no_grad():
-                text_features = self.model.get_text_features(**inputs)
-            
-            # Normalize embedding
-            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-            
-            # Convert to numpy array
-            embedding = text_features.cpu().numpy().flatten()
-            
-            logger.info(f"Generated text embedding with shape: {embedding.shape}")
-            
-            return embedding
+            # Cache holds immutable bytes; each caller gets its own array
+            return np.frombuffer(self._encode_text_cached(text), dtype=np.float32).copy()
             
         except Exception as e:
             logger.error(f"Error encoding text: {str(e)}")
             return None
     
+    @functools.lru_cache(maxsize=TEXT_EMBEDDING_CACHE_SIZE)
+    def _encode_text_cached(self, text):
+        """Run the text tower; raises on error so failures aren't cached"""
+        logger.info(f"Encoding text: {text}")
+        
+        # Process text
+        inputs = self.processor(text=[text], return_tensors="pt", padding=True).to(self.device)
+        
+        # Generate embedding
+        with torch.inference_mode():
+            text_features = self.model.get_text_features(**inputs)
+        
+        # Normalize embedding in fp32
+        text_features = text_features.float()
+        text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        
+        # Convert to numpy array
+        embedding = text_features.cpu().numpy().flatten()
+        
+        logger.info(f"Generated text embedding with shape: {embedding.shape}")
+        
+        return embedding.tobytes()
+    
     def calculate_similarity(self, embedding1, embedding2):
         """
         Calculate cosine similarity between two embeddings
@@ -146,7 +344,10 @@ class CLIPService:
     
     def search_similar_images(self, query_embedding, image_embeddings, top_k=10):
         """
-        Find top-k most similar images to a query
+        Find top-k most similar images to a query (in memory)
+        
+        For photos already stored in the database prefer
+        search_similar_images_db, which uses the vector index.
         
         Args:
             query_embedding: Query embedding vector
@@ -156,21 +357,90 @@ class CLIPService:
         Returns:
             list: List of (image_id, similarity_score) tuples, sorted by similarity
         """
+        if not image_embeddings:
+            return []
+        
         try:
-            similarities = []
+            ids, embeddings = zip(*image_embeddings)
+            matrix = np.asarray(embeddings, dtype=np.float32)
             
-            for image_id, image_embedding in image_embeddings:
-                similarity = self.calculate_similarity(query_embedding, image_embedding)
-                similarities.append((image_id, similarity))
+            return self.search_similar_images_np(query_embedding, matrix, ids, top_k)
             
-            # Sort by similarity (descending)
-            similarities.sort(key=lambda x: x[1], reverse=True)
+        except Exception as e:
+            logger.error(f"Error in similarity search: {str(e)}")
+            return []
+    
+    def search_similar_images_np(self, query_embedding, matrix, ids, top_k=10, normalized=False):
+        """
+        Top-k cosine search over an (N, 512) embedding matrix with one GEMV
+        
+        Args:
+            query_embedding: Query embedding vector
+            matrix: (N, 512) embedding matrix (float32 or float16)
+            ids: Sequence of N image ids, aligned with matrix rows
+            top_k: Number of results to return
+            normalized: Rows are already L2-normalized (skip renormalizing;
+                worth doing once for a matrix that is searched repeatedly)
+        
+        Returns:
+            list: List of (image_id, similarity_score) tuples, sorted by similarity
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if not normalized:
+            matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / np.linalg.norm(query)
+        
+        scores = matrix @ query
+        
+        # Partial selection, then sort only the k winners
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        
+        return [(ids[idx], float(scores[idx])) for idx in top]
+    
+    def search_similar_images_db(self, session, query_embedding, top_k=10, ef_search=None):
+        """
+        Find top-k most similar photos inside PostgreSQL
+        
+        Uses pgvector's cosine distance so the HNSW index on
+        photos.clip_embedding serves the ORDER BY ... LIMIT; embeddings are
+        L2-normalized, so the scores match calculate_similarity.
+        
+        Args:
+            session: Database session
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            ef_search: Optional HNSW candidate list size for this query
+                (pgvector default is 40; raise it when recall matters)
+        
+        Returns:
+            list: List of (photo_id, similarity_score) tuples, sorted by similarity
+        """
+        from models import Photo  # keep the service importable without a database
+        
+        try:
+            if ef_search is not None:
+                # SET LOCAL only lasts until the end of the current transaction
+                session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+            
+            distance = Photo.clip_embedding.cosine_distance(
+                np.asarray(query_embedding, dtype=np.float16)
+            ).label('distance')
             
-            # Return top-k
-            return similarities[:top_k]
+            rows = session.execute(
+                select(Photo.photo_id, distance)
+                .where(Photo.clip_embedding.isnot(None))
+                .order_by(distance)
+                .limit(top_k)
+            ).all()
+            
+            return [(photo_id, 1.0 - float(dist)) for photo_id, dist in rows]
             
         except Exception as e:
-            logger.error(f"Error in similarity search: {str(e)}")
+            logger.error(f"Error in database similarity search: {str(e)}")
             return []
     
     def generate_caption_embedding(self, caption_text):
@@ -189,6 +459,17 @@ class CLIPService:
         return self.encode_text(caption_text)
 
 
+class _ImageTower(torch.nn.Module):
+    """pixel_values -> projected image embedding, as a plain forward() for ONNX export"""
+    
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, pixel_values):
+        return self.model.get_image_features(pixel_values=pixel_values)
+
+
 # Singleton instance
 _clip_service = None
 
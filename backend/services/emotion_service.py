@@ -9,6 +9,8 @@ import cv2
 import logging
 from pathlib import Path
 
+from .image_io import read_image
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -27,16 +29,104 @@ class EmotionService:
         'disgust': -0.6
     }
     
+    # Output order of DeepFace's emotion model; canonical order for vector math
+    EMOTION_LABELS = ('angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral')
+    
+    # EMOTION_VALENCE as a vector in EMOTION_LABELS order
+    VALENCE_VEC = np.array(list(map(EMOTION_VALENCE.get, EMOTION_LABELS)), dtype=np.float32)
+    
+    # Returned when a face can't be analyzed
+    NEUTRAL_EMOTION = {
+        'dominant_emotion': 'neutral',
+        'confidence': 0.5,
+        'all_emotions': {'neutral': 1.0},
+        'valence': 0.0
+    }
+    
     def __init__(self):
         self.model_name = 'Emotion'  # DeepFace emotion model
+        self._emotion_model = None
+    
+    def _get_emotion_model(self):
+        """Load DeepFace's emotion CNN once (48x48 grayscale in, 7 probabilities out)"""
+        if self._emotion_model is None:
+            self._emotion_model = DeepFace.build_model(self.model_name)
+        return self._emotion_model
     
-    def detect_emotion(self, image_path, face_location=None):
+    def detect_emotions_batch(self, image, face_locations, image_path=None):
+        """
+        Detect emotions for all faces in one frame with a single forward pass
+        
+        Faces are already located, so DeepFace's own face detector is skipped:
+        each box is cropped, converted to 48x48 grayscale and the crops go
+        through the emotion model as one batch.
+        
+        Args:
+            image: RGB array (as shared with FaceService)
+            face_locations: List of (top, right, bottom, left) tuples
+            image_path: Optional path, used for logging only
+        
+        Returns:
+            list: Emotion dict per face (same format as detect_emotion)
+        """
+        if not face_locations:
+            return []
+        
+        try:
+            crops = []
+            valid = []
+            for idx, (top, right, bottom, left) in enumerate(face_locations):
+                crop = image[max(0, top):bottom, max(0, left):right]
+                if crop.size == 0:
+                    continue
+                gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+                crops.append(cv2.resize(gray, (48, 48)))
+                valid.append(idx)
+            
+            results = [dict(self.NEUTRAL_EMOTION) for _ in face_locations]
+            if not crops:
+                return results
+            
+            batch = np.stack(crops)[..., None].astype(np.float32) / 255.0
+            probs = np.asarray(self._get_emotion_model().predict(batch, verbose=0), dtype=np.float32)
+            
+            # All valences in one product; rows are softmax outputs
+            totals = probs.sum(axis=1)
+            valences = (probs @ self.VALENCE_VEC) / np.where(totals > 0, totals, 1)
+            dominant = probs.argmax(axis=1)
+            
+            for row, idx in enumerate(valid):
+                scores = probs[row] / totals[row] if totals[row] > 0 else probs[row]
+                results[idx] = {
+                    'dominant_emotion': self.EMOTION_LABELS[dominant[row]],
+                    'confidence': round(float(scores[dominant[row]]), 3),
+                    'all_emotions': {
+                        label: round(float(score), 3)
+                        for label, score in zip(self.EMOTION_LABELS, scores)
+                    },
+                    'valence': round(float(valences[row]), 3)
+                }
+            
+            logger.info(f"Detected emotions for {len(valid)} faces in {image_path or 'frame'}")
+            
+            return results
+            
+        except Exception as e:
+            logger.warning(f"Batched emotion analysis failed, analyzing faces one by one: {str(e)}")
+            return [
+                self.detect_emotion(image_path, location, image=image)
+                for location in face_locations
+            ]
+    
+    def detect_emotion(self, image_path, face_location=None, image=None):
         """
         Detect emotion in a face
         
         Args:
             image_path: Path to image file
             face_location: Optional tuple (top, right, bottom, left) to analyze specific region
+            image: Optional RGB array already decoded from image_path (as shared
+                with FaceService); only the face crop is converted to BGR
         
         Returns:
             dict: {
@@ -49,16 +139,23 @@ class EmotionService:
         try:
             logger.info(f"Detecting emotion in: {image_path}")
             
-            # Load image
-            image = cv2.imread(str(image_path))
-            if image is None:
-                logger.error(f"Could not read image: {image_path}")
-                return None
-            
-            # If face location provided, crop to that region
-            if face_location:
-                top, right, bottom, left = face_location
-                image = image[top:bottom, left:right]
+            if image is not None:
+                # Crop the shared RGB frame first, then convert just the crop
+                if face_location:
+                    top, right, bottom, left = face_location
+                    image = image[top:bottom, left:right]
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+            else:
+                # Load image
+                image = read_image(image_path)
+                if image is None:
+                    logger.error(f"Could not read image: {image_path}")
+                    return None
+                
+                # If face location provided, crop to that region
+                if face_location:
+                    top, right, bottom, left = face_location
+                    image = image[top:bottom, left:right]
             
             # Analyze emotion using DeepFace
             try:
@@ -96,12 +193,7 @@ class EmotionService:
             except Exception as e:
                 logger.warning(f"DeepFace analysis failed: {str(e)}")
                 # Return neutral default
-                return {
-                    'dominant_emotion': 'neutral',
-                    'confidence': 0.5,
-                    'all_emotions': {'neutral': 1.0},
-                    'valence': 0.0
-                }
+                return dict(self.NEUTRAL_EMOTION)
         
         except Exception as e:
             logger.error(f"Error in emotion detection: {str(e)}")
@@ -117,21 +209,14 @@ class EmotionService:
         Returns:
             float: Valence score from -1 (negative) to +1 (positive)
         """
-        total_valence = 0
-        total_weight = 0
-        
-        for emotion, score in emotion_scores.items():
-            emotion_lower = emotion.lower()
-            if emotion_lower in self.EMOTION_VALENCE:
-                weight = score / 100.0
-                valence = self.EMOTION_VALENCE[emotion_lower]
-                total_valence += valence * weight
-                total_weight += weight
-        
-        if total_weight == 0:
+        scores = {emotion.lower(): score for emotion, score in emotion_scores.items()}
+        probs = np.array([scores.get(e, 0.0) for e in self.EMOTION_LABELS], dtype=np.float32)
+        
+        total = probs.sum()
+        if total == 0:
             return 0.0
         
-        return total_valence / total_weight
+        return float(probs @ self.VALENCE_VEC) / float(total)
     
     def aggregate_photo_emotions(self, face_emotions):
         """
@@ -171,8 +256,9 @@ class EmotionService:
         # Determine dominant emotion for photo
         dominant_emotion = max(emotion_counts, key=emotion_counts.get) if emotion_counts else 'neutral'
         
-        # Calculate average valence
-        average_valence = np.mean(valences) if valences else 0.0
+        # Calculate average valence (a handful of faces: plain floats beat
+        # the per-call overhead of a numpy reduction)
+        average_valence = sum(valences) / len(valences) if valences else 0.0
         
         # Calculate mood score (-1 to +1, where +1 = all positive, -1 = all negative)
         # This considers both valence and consistency
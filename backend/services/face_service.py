@@ -6,38 +6,141 @@ Phase 2.1 & 2.2
 import face_recognition
 import numpy as np
 from sklearn.cluster import DBSCAN
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 import cv2
+import dlib
+from sqlalchemy import select
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
+import os
+import threading
+
+from .image_io import read_image
+
+try:
+    import faiss
+except ImportError:  # optional; clustering falls back to blocked NumPy GEMMs
+    faiss = None
+
+try:
+    from turbojpeg import TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):  # optional; thumbnails fall back to cv2.imwrite
+    _turbo_jpeg = None
+
+try:
+    import mediapipe as mp
+except ImportError:  # optional; CPU detection falls back to dlib HOG
+    mp = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Longest image side used for HOG detection (boxes are scaled back up)
+HOG_MAX_DIM = 800
+
+# Rows per GEMM tile when building the eps-graph without FAISS
+EPS_GRAPH_BLOCK_SIZE = 256
+
+# JPEG quality for 200x200 cluster thumbnails
+THUMBNAIL_JPEG_QUALITY = 85
+THUMBNAIL_SIZE = 200
+
+# cv2 decode flags for decoding at 1/1, 1/2, 1/4 and 1/8 scale
+THUMBNAIL_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
 
 class FaceService:
     """Handle all face-related operations with quality assessment"""
     
-    def __init__(self):
+    def __init__(self, detector=None):
+        """
+        Args:
+            detector: CPU face detector, 'hog' or 'mediapipe' (defaults to the
+                LUMEO_FACE_DETECTOR env var, 'hog' unless set). CUDA builds of
+                dlib always use the batched CNN detector.
+        """
         self.face_encodings = []
         self.face_locations = []
         self.quality_scores = []
+        
+        # Pin the dlib models face_recognition loaded at import so every call
+        # goes straight to them (no per-call wrapper lookups)
+        self._face_detector = face_recognition.api.face_detector
+        self._pose_predictor = face_recognition.api.pose_predictor_5_point
+        self._face_encoder = face_recognition.api.face_encoder
+        
+        if detector is None:
+            detector = os.getenv('LUMEO_FACE_DETECTOR', 'hog')
+        
+        # MediaPipe's TFLite (XNNPACK) detector is several times faster than
+        # HOG on CPU; model_selection=1 is the full-range model for photos
+        self._mp_detector = None
+        if detector == 'mediapipe' and not dlib.DLIB_USE_CUDA:
+            if mp is None:
+                logger.warning("LUMEO_FACE_DETECTOR=mediapipe but mediapipe is not installed, using HOG")
+            else:
+                self._mp_detector = mp.solutions.face_detection.FaceDetection(
+                    model_selection=1, min_detection_confidence=0.5
+                )
+    
+    def load_image(self, image_path):
+        """
+        Decode an image once as RGB so it can be shared by every face pass
+        
+        Decoded with OpenCV, the same decoder (and EXIF orientation handling)
+        used for thumbnails and the other services, so face boxes line up.
+        
+        Args:
+            image_path: Path to image file
+        
+        Returns:
+            numpy.array: RGB image, or None on error
+        """
+        try:
+            image = read_image(image_path)
+            if image is None:
+                logger.error(f"Could not read image {image_path}")
+                return None
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        except Exception as e:
+            logger.error(f"Could not read image {image_path}: {str(e)}")
+            return None
     
-    def detect_faces(self, image_path):
+    def detect_faces(self, image_path, image=None):
         """
         Detect faces in an image and return encodings with locations
         
+        Args:
+            image_path: Path to image file
+            image: Optional RGB array already decoded from image_path
+        
         Returns:
             tuple: (face_encodings, face_locations, quality_scores)
         """
         try:
             logger.info(f"Detecting faces in: {image_path}")
             
-            # Load image
-            image = face_recognition.load_image_file(image_path)
+            # Load image (unless the caller already decoded it)
+            if image is None:
+                image = self.load_image(image_path)
+                if image is None:
+                    return [], [], []
             
-            # Find face locations and encodings
-            face_locations = face_recognition.face_locations(image, model="hog")
-            face_encodings = face_recognition.face_encodings(image, face_locations)
+            if self._mp_detector is not None:
+                face_locations = self._locate_faces_mediapipe(image)
+            else:
+                # HOG cost scales with pixel count; find faces on a downscaled
+                # copy and map the boxes back to full resolution
+                face_locations = self._locate_faces_hog(image)
+            face_encodings = self._encode_faces(image, face_locations)
             
             # Calculate quality scores for each face
             quality_scores = []
@@ -53,6 +156,156 @@ class FaceService:
             logger.error(f"Error detecting faces in {image_path}: {str(e)}")
             return [], [], []
     
+    def _locate_faces_hog(self, image, max_dim=HOG_MAX_DIM):
+        """
+        HOG face locations, detected on a copy no larger than max_dim
+        
+        Args:
+            image: RGB numpy array
+            max_dim: Longest side used for detection
+        
+        Returns:
+            list: (top, right, bottom, left) boxes in original image coordinates
+        """
+        height, width = image.shape[:2]
+        scale = min(1.0, max_dim / max(height, width))
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        return [
+            (
+                max(0, int(rect.top() / scale)),
+                min(width, int(rect.right() / scale)),
+                min(height, int(rect.bottom() / scale)),
+                max(0, int(rect.left() / scale))
+            )
+            for rect in self._face_detector(image, 1)
+        ]
+    
+    def _locate_faces_mediapipe(self, image):
+        """
+        MediaPipe face locations in the same format as _locate_faces_hog
+        
+        Args:
+            image: RGB numpy array
+        
+        Returns:
+            list: (top, right, bottom, left) boxes in pixel coordinates
+        """
+        height, width = image.shape[:2]
+        result = self._mp_detector.process(image)
+        
+        face_locations = []
+        for detection in result.detections or []:
+            box = detection.location_data.relative_bounding_box
+            top = max(0, int(box.ymin * height))
+            left = max(0, int(box.xmin * width))
+            bottom = min(height, int((box.ymin + box.height) * height))
+            right = min(width, int((box.xmin + box.width) * width))
+            if bottom > top and right > left:
+                face_locations.append((top, right, bottom, left))
+        
+        return face_locations
+    
+    def _encode_faces(self, image, face_locations):
+        """
+        128-d encodings for all faces in an image with one dlib call
+        
+        Args:
+            image: RGB numpy array
+            face_locations: List of (top, right, bottom, left) boxes
+        
+        Returns:
+            list: numpy.array encoding per face
+        """
+        if not face_locations:
+            return []
+        
+        shapes = dlib.full_object_detections()
+        for top, right, bottom, left in face_locations:
+            shapes.append(self._pose_predictor(image, dlib.rectangle(left, top, right, bottom)))
+        
+        return [np.array(descriptor) for descriptor in self._face_encoder.compute_face_descriptor(image, shapes)]
+    
+    def load_images(self, image_paths):
+        """
+        Decode several images in parallel (PIL/libjpeg release the GIL)
+        
+        Args:
+            image_paths: List of image paths
+        
+        Returns:
+            list: RGB arrays in the same order, None for unreadable files
+        """
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(image_paths)))) as executor:
+            return list(executor.map(self.load_image, image_paths))
+    
+    def detect_faces_batch(self, image_paths, images=None, batch_size=32):
+        """
+        Detect faces in many images with one model dispatch per batch
+        
+        With a CUDA build of dlib, locations come from the CNN detector via
+        face_recognition.batch_face_locations (images of the same size are
+        batched together). Otherwise each image goes through the CPU detector
+        (HOG or MediaPipe) as in detect_faces, on the frames already in
+        memory: HOG runs on a thread pool (dlib releases the GIL while it
+        scans), MediaPipe's graph is stateful so it runs one image at a time.
+        
+        Args:
+            image_paths: List of image paths
+            images: Optional RGB arrays already decoded from image_paths
+            batch_size: Images per CNN forward pass
+        
+        Returns:
+            list: (face_encodings, face_locations, quality_scores) per image
+        """
+        if images is None:
+            images = self.load_images(image_paths)
+        
+        if not dlib.DLIB_USE_CUDA:
+            def detect(path, image):
+                return self.detect_faces(path, image=image) if image is not None else ([], [], [])
+            
+            if self._mp_detector is not None:
+                return [detect(path, image) for path, image in zip(image_paths, images)]
+            return list(_get_detection_pool().map(detect, image_paths, images))
+        
+        # batch_face_locations needs equally sized frames in each batch
+        all_locations = [[] for _ in images]
+        by_shape = {}
+        for idx, image in enumerate(images):
+            if image is not None:
+                by_shape.setdefault(image.shape, []).append(idx)
+        
+        for indices in by_shape.values():
+            try:
+                batch_locations = face_recognition.batch_face_locations(
+                    [images[idx] for idx in indices],
+                    number_of_times_to_upsample=0,
+                    batch_size=batch_size
+                )
+                for idx, locations in zip(indices, batch_locations):
+                    all_locations[idx] = locations
+            except Exception as e:
+                logger.error(f"Batched face detection failed: {str(e)}")
+        
+        results = []
+        for path, image, face_locations in zip(image_paths, images, all_locations):
+            if image is None or not face_locations:
+                results.append(([], [], []))
+                continue
+            
+            try:
+                face_encodings = self._encode_faces(image, face_locations)
+                quality_scores = [self._calculate_face_quality(image, location) for location in face_locations]
+                logger.info(f"Found {len(face_encodings)} faces in {path}")
+                results.append((face_encodings, face_locations, quality_scores))
+            except Exception as e:
+                logger.error(f"Error encoding faces in {path}: {str(e)}")
+                results.append(([], [], []))
+        
+        return results
+    
     def _calculate_face_quality(self, image, face_location):
         """
         Calculate quality score for a detected face (0-1 scale)
@@ -76,15 +329,19 @@ class FaceService:
             # Extract face region
             face_image = image[top:bottom, left:right]
             
-            # Convert to grayscale for analysis
+            # Convert to grayscale for analysis (crop only; faces are a small
+            # fraction of the frame)
             gray_face = cv2.cvtColor(face_image, cv2.COLOR_RGB2GRAY)
             
             # 1. Sharpness Score (Laplacian variance)
-            laplacian_var = cv2.Laplacian(gray_face, cv2.CV_64F).var()
+            # int16 holds the full 3x3 Laplacian range of uint8 input, and
+            # meanStdDev reads it once instead of NumPy's mean-then-deviation
+            _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(gray_face, cv2.CV_16S))
+            laplacian_var = float(laplacian_std[0, 0]) ** 2
             sharpness_score = min(laplacian_var / 500, 1.0)  # Normalize
             
             # 2. Brightness Score
-            brightness = np.mean(gray_face)
+            brightness = cv2.mean(gray_face)[0]
             # Optimal brightness is around 127 (middle gray)
             brightness_score = 1.0 - abs(brightness - 127) / 127
             
@@ -120,7 +377,7 @@ class FaceService:
         Cluster face encodings using DBSCAN with quality-weighted selection
         
         Args:
-            encodings: List of face encodings
+            encodings: List of face encodings or an (N, 128) matrix
             quality_scores: Optional quality scores for each face
             min_samples: Minimum samples for DBSCAN
             eps: DBSCAN distance threshold
@@ -133,20 +390,129 @@ class FaceService:
         
         logger.info(f"Clustering {len(encodings)} faces with eps={eps}")
         
-        # Convert to numpy array
-        encodings_array = np.array(encodings)
+        # Single contiguous float32 matrix (no copy if the caller already built one)
+        encodings_array = np.ascontiguousarray(encodings, dtype=np.float32)
+        
+        # Sparse eps-neighbour graph (FAISS range search, or blocked GEMMs)
+        distances = self._build_eps_graph(encodings_array, eps)
         
-        # Use DBSCAN for clustering
-        clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='euclidean')
-        labels = clustering.fit_predict(encodings_array)
+        if min_samples <= 1:
+            # Every face is a core point, so DBSCAN reduces to the connected
+            # components of the eps-graph (only the graph structure is read)
+            _, labels = connected_components(distances, directed=False)
+        else:
+            clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed', n_jobs=-1)
+            labels = clustering.fit_predict(distances)
         
-        n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-        n_noise = list(labels).count(-1)
+        n_noise = int(np.count_nonzero(labels == -1))
+        n_clusters = len(np.unique(labels)) - (1 if n_noise else 0)
         
         logger.info(f"Clustering complete: {n_clusters} clusters, {n_noise} noise points")
         
         return labels
     
+    def assign_to_clusters(self, encodings, centroids, eps=0.6):
+        """
+        Match faces to the nearest existing cluster centroid
+        
+        Args:
+            encodings: (N, 128) face encodings
+            centroids: (K, 128) mean encoding of each existing cluster
+            eps: Maximum distance for a face to join a cluster
+        
+        Returns:
+            numpy.array: Centroid index per face, or -1 if none is within eps
+        """
+        encodings_array = np.ascontiguousarray(encodings, dtype=np.float32)
+        centroids_array = np.ascontiguousarray(centroids, dtype=np.float32)
+        
+        if len(encodings_array) == 0 or len(centroids_array) == 0:
+            return np.full(len(encodings_array), -1)
+        
+        if faiss is not None:
+            index = faiss.IndexFlatL2(centroids_array.shape[1])
+            index.add(centroids_array)
+            sq_distances, nearest = index.search(encodings_array, 1)
+            sq_distances, nearest = sq_distances[:, 0], nearest[:, 0]
+        else:
+            # ||a||^2 + ||c||^2 - 2ac, one GEMM against all centroids
+            sq_distances = encodings_array @ centroids_array.T
+            sq_distances *= -2
+            sq_distances += np.einsum('ij,ij->i', encodings_array, encodings_array)[:, None]
+            sq_distances += np.einsum('ij,ij->i', centroids_array, centroids_array)[None, :]
+            nearest = sq_distances.argmin(axis=1)
+            sq_distances = sq_distances[np.arange(len(nearest)), nearest]
+        
+        assigned = np.where(sq_distances <= eps * eps, nearest, -1)
+        logger.info(f"Matched {np.count_nonzero(assigned != -1)}/{len(assigned)} faces to existing clusters")
+        
+        return assigned
+    
+    @staticmethod
+    def _build_eps_graph(encodings_array, eps):
+        """
+        Sparse eps-neighbour distance graph
+        
+        Uses a FAISS range search when available, else blocked GEMMs. Only
+        pairs closer than eps are stored, so memory grows with the number of
+        neighbours rather than N^2.
+        
+        Args:
+            encodings_array: (N, D) float32 matrix
+            eps: Neighbourhood radius
+        
+        Returns:
+            scipy.sparse.csr_matrix: (N, N) distances for DBSCAN(metric='precomputed')
+        """
+        n = encodings_array.shape[0]
+        
+        if faiss is not None:
+            index = faiss.IndexFlatL2(encodings_array.shape[1])
+            index.add(encodings_array)
+            
+            # FAISS returns squared L2 distances
+            lims, sq_distances, neighbours = index.range_search(encodings_array, eps * eps)
+            rows = np.repeat(np.arange(n), np.diff(lims))
+        else:
+            rows, neighbours, sq_distances = FaceService._radius_neighbors_blocked(encodings_array, eps)
+        
+        distances = np.sqrt(np.maximum(sq_distances, 0))
+        
+        return csr_matrix((distances, (rows, neighbours)), shape=(n, n))
+    
+    @staticmethod
+    def _radius_neighbors_blocked(encodings_array, eps, block_size=EPS_GRAPH_BLOCK_SIZE):
+        """
+        All pairs within eps, one (block_size, N) GEMM tile at a time
+        
+        Uses ||a||^2 + ||b||^2 - 2ab per tile, so peak memory is
+        block_size * N floats instead of the full N x N matrix.
+        
+        Args:
+            encodings_array: (N, D) float32 matrix
+            eps: Neighbourhood radius
+            block_size: Rows per tile
+        
+        Returns:
+            tuple: (rows, cols, squared distances) of the neighbour pairs
+        """
+        sq_norms = np.einsum('ij,ij->i', encodings_array, encodings_array)
+        rows, cols, sq_distances = [], [], []
+        
+        for start in range(0, encodings_array.shape[0], block_size):
+            block = encodings_array[start:start + block_size]
+            tile = block @ encodings_array.T
+            tile *= -2
+            tile += sq_norms[start:start + block_size, None]
+            tile += sq_norms[None, :]
+            
+            tile_rows, tile_cols = np.nonzero(tile <= eps * eps)
+            rows.append(tile_rows + start)
+            cols.append(tile_cols)
+            sq_distances.append(tile[tile_rows, tile_cols])
+        
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(sq_distances)
+    
     def select_best_face(self, faces_data):
         """
         Select the best representative face from a cluster based on quality
@@ -167,7 +533,7 @@ class FaceService:
         
         return best_face
     
-    def extract_face_thumbnail(self, image_path, face_location, output_path, padding=40):
+    def extract_face_thumbnail(self, image_path, face_location, output_path, padding=40, image=None):
         """
         Extract and save face thumbnail with padding
         
@@ -176,33 +542,26 @@ class FaceService:
             face_location: tuple (top, right, bottom, left)
             output_path: Where to save thumbnail
             padding: Pixels to add around face
+            image: Optional BGR array already decoded from image_path
         
         Returns:
             bool: Success status
         """
         try:
-            image = cv2.imread(str(image_path))
+            if image is None:
+                image = read_image(image_path)
             if image is None:
                 logger.error(f"Could not read image: {image_path}")
                 return False
             
-            top, right, bottom, left = face_location
-            
-            # Add padding
-            height, width = image.shape[:2]
-            top = max(0, top - padding)
-            left = max(0, left - padding)
-            bottom = min(height, bottom + padding)
-            right = min(width, right + padding)
-            
-            # Extract face region
-            face_image = image[top:bottom, left:right]
-            
-            # Resize to consistent thumbnail size
-            face_image = cv2.resize(face_image, (200, 200))
+            face_image = self.crop_face_thumbnail(image, face_location, padding)
             
             # Save thumbnail
-            cv2.imwrite(str(output_path), face_image)
+            if _turbo_jpeg is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(_turbo_jpeg.encode(face_image, quality=THUMBNAIL_JPEG_QUALITY))
+            else:
+                cv2.imwrite(str(output_path), face_image, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_JPEG_QUALITY])
             
             logger.info(f"Thumbnail saved to: {output_path}")
             return True
@@ -211,6 +570,72 @@ class FaceService:
             logger.error(f"Error extracting face thumbnail: {str(e)}")
             return False
     
+    def extract_face_thumbnails(self, jobs, padding=40):
+        """
+        Save several face thumbnails, decoding each source image only once
+        
+        Args:
+            jobs: List of (image_path, face_location, output_path)
+            padding: Pixels to add around each face
+        
+        Returns:
+            int: Number of thumbnails written
+        """
+        by_image = {}
+        for image_path, face_location, output_path in jobs:
+            by_image.setdefault(str(image_path), []).append((face_location, output_path))
+        
+        written = 0
+        for image_path, faces in by_image.items():
+            # libjpeg can decode at 1/2, 1/4 or 1/8 scale for a fraction of
+            # the cost; use the smallest scale that keeps every face at least
+            # thumbnail size, and scale the boxes to match
+            smallest_face = min(min(bottom - top, right - left) for (top, right, bottom, left), _ in faces)
+            reduction = next((f for f in (8, 4, 2) if smallest_face // f >= THUMBNAIL_SIZE), 1)
+            
+            image = read_image(image_path, THUMBNAIL_DECODE_FLAGS[reduction])
+            if image is None:
+                logger.error(f"Could not read image: {image_path}")
+                continue
+            
+            for face_location, output_path in faces:
+                if reduction > 1:
+                    face_location = tuple(coord // reduction for coord in face_location)
+                if self.extract_face_thumbnail(image_path, face_location, output_path, padding // reduction, image=image):
+                    written += 1
+        
+        return written
+    
+    @staticmethod
+    def crop_face_thumbnail(image, face_location, padding=40, size=(THUMBNAIL_SIZE, THUMBNAIL_SIZE)):
+        """
+        Crop a padded face region and resize it to thumbnail size (no I/O)
+        
+        Args:
+            image: numpy array of full image
+            face_location: tuple (top, right, bottom, left)
+            padding: Pixels to add around face
+            size: Output (width, height)
+        
+        Returns:
+            numpy.array: Resized face crop
+        """
+        top, right, bottom, left = face_location
+        
+        # Add padding
+        height, width = image.shape[:2]
+        top = max(0, top - padding)
+        left = max(0, left - padding)
+        bottom = min(height, bottom + padding)
+        right = min(width, right + padding)
+        
+        # Slicing is a view; cv2.resize does the only pixel pass.
+        # INTER_AREA is the right filter when shrinking faces down to 200x200.
+        face_image = image[top:bottom, left:right]
+        interpolation = cv2.INTER_AREA if face_image.shape[0] >= size[1] else cv2.INTER_LINEAR
+        
+        return cv2.resize(face_image, size, interpolation=interpolation)
+    
     def compare_faces(self, known_encoding, unknown_encoding, tolerance=0.6):
         """
         Compare two face encodings
@@ -227,6 +652,88 @@ class FaceService:
         is_match = distance <= tolerance
         
         return is_match, round(distance, 3)
+    
+    def compare_faces_batch(self, query_encoding, gallery, tolerance=0.6):
+        """
+        Compare one face encoding against many
+        
+        Args:
+            query_encoding: Face encoding to compare
+            gallery: (N, 128) matrix of encodings
+            tolerance: Match threshold (lower = stricter)
+        
+        Returns:
+            tuple: (is_match bool array, distances float32 array), in gallery order
+        """
+        query = np.ascontiguousarray(query_encoding, dtype=np.float32)
+        gallery_array = np.ascontiguousarray(gallery, dtype=np.float32)
+        
+        if len(gallery_array) == 0:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.float32)
+        
+        # ||g||^2 + ||q||^2 - 2gq: one GEMV instead of an (N, 128) difference array
+        sq_distances = np.einsum('ij,ij->i', gallery_array, gallery_array)
+        sq_distances -= 2 * (gallery_array @ query)
+        sq_distances += query @ query
+        distances = np.sqrt(np.maximum(sq_distances, 0, out=sq_distances))
+        
+        return distances <= tolerance, distances
+    
+    def find_nearest_face_db(self, session, encoding, tolerance=0.6):
+        """
+        Find the closest stored face inside PostgreSQL
+        
+        Uses pgvector's L2 distance so the HNSW index on
+        face_embeddings.embedding serves the ORDER BY ... LIMIT 1.
+        
+        Args:
+            session: Database session
+            encoding: Face encoding to look up
+            tolerance: Match threshold (lower = stricter)
+        
+        Returns:
+            tuple: (FaceEmbedding, distance), or (None, None) if no face is within tolerance
+        """
+        from models import FaceEmbedding  # keep the service importable without a database
+        
+        try:
+            distance = FaceEmbedding.embedding.l2_distance(
+                np.asarray(encoding, dtype=np.float16)
+            ).label('distance')
+            
+            row = session.execute(
+                select(FaceEmbedding, distance)
+                .order_by(distance)
+                .limit(1)
+            ).first()
+            
+            if row is None or row.distance > tolerance:
+                return None, None
+            
+            return row[0], round(float(row.distance), 3)
+            
+        except Exception as e:
+            logger.error(f"Error in database face lookup: {str(e)}")
+            return None, None
+
+
+# Thread pool for CPU (HOG) face detection over frames already in memory.
+# Threads, not processes: spawned workers would re-import app.py (loading
+# every model again) and re-read and re-decode each photo from disk.
+_detection_pool = None
+_detection_pool_lock = threading.Lock()
+
+def _get_detection_pool():
+    """Get or create the face detection thread pool"""
+    global _detection_pool
+    if _detection_pool is None:
+        with _detection_pool_lock:
+            if _detection_pool is None:
+                _detection_pool = ThreadPoolExecutor(
+                    max_workers=max(1, (os.cpu_count() or 2) // 2),
+                    thread_name_prefix='face-detect'
+                )
+    return _detection_pool
 
 
 # Singleton instance
@@ -0,0 +1,67 @@
+"""
+Image I/O - Shared OpenCV decode from memory-mapped files
+Used by the face, object and thumbnail paths
+"""
+
+import mmap
+import logging
+import os
+
+import cv2
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def read_image(image_path, flags=cv2.IMREAD_COLOR):
+    """
+    Decode an image with OpenCV straight from a memory-mapped file
+
+    Same result as cv2.imread (including EXIF orientation), but the
+    compressed bytes are read from the shared page cache mapping instead
+    of being copied through a stdio buffer, so concurrent decoders in
+    other threads/processes reuse the same pages.
+
+    Args:
+        image_path: Path to image file
+        flags: cv2.IMREAD_* flags
+
+    Returns:
+        numpy.array: BGR (or grayscale) image, or None if it can't be read
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            if hasattr(os, 'posix_fadvise'):
+                # Whole-file read ahead of the decoder
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                buffer = np.frombuffer(mm, dtype=np.uint8)
+                image = cv2.imdecode(buffer, flags)
+                del buffer  # the map can't close while a view of it exists
+
+        return image
+
+    except (OSError, ValueError) as e:  # missing/unreadable or empty file
+        logger.error(f"Could not read image {image_path}: {str(e)}")
+        return None
+
+
+def difference_hash(image):
+    """
+    64-bit perceptual difference hash (dHash) of a decoded image
+
+    Bursts and light edits of the same scene land within a few bits of
+    each other; compare with (a ^ b).bit_count().
+
+    Args:
+        image: RGB (or BGR) numpy array
+
+    Returns:
+        int: 64-bit hash
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
@@ -0,0 +1,265 @@
+"""
+Metadata Cache - Per-file results keyed by (path, mtime, size) or content hash
+Lets re-indexing skip EXIF extraction, YOLO and CLIP on files that haven't changed
+"""
+
+import functools
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# SQLite file for the cache ('' or '0' disables it)
+META_CACHE_PATH = os.getenv('LUMEO_META_CACHE', 'meta_cache.db')
+
+# Eviction: entries older than MAX_AGE_DAYS go, then the oldest entries until
+# the stored results fit in MAX_MB. Checked every PRUNE_EVERY writes.
+META_CACHE_MAX_MB = int(os.getenv('LUMEO_META_CACHE_MAX_MB', '2048'))
+META_CACHE_MAX_AGE_DAYS = int(os.getenv('LUMEO_META_CACHE_MAX_AGE_DAYS', '90'))
+META_CACHE_PRUNE_EVERY = 500
+
+_local = threading.local()
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def _connection():
+    """Per-thread SQLite connection"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(META_CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "key TEXT PRIMARY KEY, value BLOB, stored_at REAL NOT NULL DEFAULT 0, size INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Caches written before eviction existed: their rows count as oldest
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(meta)")}
+        if 'stored_at' not in columns:
+            conn.execute("ALTER TABLE meta ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+            conn.execute("ALTER TABLE meta ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS meta_stored_at ON meta (stored_at)")
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def cache_key(namespace, image_path, *args, **kwargs):
+    """
+    Cache key for a file, or None if the cache is off or the file can't be stat'ed
+
+    Args:
+        namespace: Which result this is (e.g. 'exif', 'objects')
+        image_path: Path to the file
+        *args, **kwargs: Extra arguments the result depends on (keyword
+            arguments are keyed in sorted order)
+
+    Returns:
+        str: Key that changes whenever the file is modified
+    """
+    if META_CACHE_PATH in ('', '0'):
+        return None
+
+    try:
+        path = os.path.abspath(image_path)
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    key = f"{namespace}:{path}:{st.st_mtime_ns}:{st.st_size}:{args!r}"
+    if kwargs:
+        key += f":{sorted(kwargs.items())!r}"
+    return key
+
+
+def content_key(namespace, image_path, *args):
+    """
+    Cache key from the file's bytes (SHA-256), or None if off/unreadable
+
+    Unlike cache_key this also matches copies of the same photo under
+    another name, e.g. a re-upload. The file is hashed straight from a
+    read-only mapping in one call (no read buffers; the GIL is released
+    while hashing).
+
+    Args:
+        namespace: Which result this is (e.g. 'clip')
+        image_path: Path to the file
+        *args: Extra arguments the result depends on (e.g. model name)
+
+    Returns:
+        str: Key shared by all files with identical contents
+    """
+    if META_CACHE_PATH in ('', '0'):
+        return None
+
+    try:
+        with open(image_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            digest = hashlib.sha256(mm).hexdigest()
+    except (OSError, ValueError):  # missing/unreadable or empty file
+        return None
+
+    return f"{namespace}:{digest[:32]}:{args!r}"
+
+
+def cache_get(key):
+    """
+    Look up a cached result
+
+    Returns:
+        tuple: (hit, value)
+    """
+    if key is None:
+        return False, None
+
+    try:
+        row = _connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return True, pickle.loads(row[0])
+    except Exception as e:
+        logger.warning(f"Metadata cache read failed: {str(e)}")
+
+    return False, None
+
+
+def cache_put(key, value):
+    """Store a result (pickled, so datetimes and tuples round-trip)"""
+    global _writes
+    if key is None:
+        return
+
+    try:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value, stored_at, size) VALUES (?, ?, ?, ?)",
+            (key, blob, time.time(), len(blob))
+        )
+        conn.commit()
+    except Exception as e:
+        logger.warning(f"Metadata cache write failed: {str(e)}")
+        return
+
+    with _writes_lock:
+        _writes += 1
+        due = _writes % META_CACHE_PRUNE_EVERY == 0
+    if due:
+        prune_cache()
+
+
+def prune_cache(max_mb=None, max_age_days=None):
+    """
+    Evict entries past the age limit, then the oldest beyond the size limit
+
+    Args:
+        max_mb: Size limit for the stored results (default META_CACHE_MAX_MB)
+        max_age_days: Age limit (default META_CACHE_MAX_AGE_DAYS)
+
+    Returns:
+        int: Number of entries removed
+    """
+    if META_CACHE_PATH in ('', '0'):
+        return 0
+    max_mb = META_CACHE_MAX_MB if max_mb is None else max_mb
+    max_age_days = META_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+
+    try:
+        conn = _connection()
+        removed = conn.execute(
+            "DELETE FROM meta WHERE stored_at < ?", (time.time() - max_age_days * 86400,)
+        ).rowcount
+        # Keep the newest entries whose running size total fits the limit
+        removed += conn.execute("""
+            DELETE FROM meta WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY stored_at DESC, key) AS kept FROM meta
+                ) WHERE kept > ?
+            )
+        """, (max_mb * 1024 * 1024,)).rowcount
+        conn.commit()
+    except Exception as e:
+        logger.warning(f"Metadata cache prune failed: {str(e)}")
+        return 0
+
+    if removed:
+        logger.info(f"Evicted {removed} metadata cache entries")
+    return removed
+
+
+def drop_stale(namespace, *args):
+    """
+    Delete a namespace's entries keyed with other extra arguments
+
+    E.g. drop_stale('pipeline', PIPELINE_VERSION) removes results from
+    earlier pipeline versions, which can never be hit again.
+
+    Args:
+        namespace: Cache namespace (stat-based keys from cache_key)
+        *args: The extra arguments current keys are made with
+
+    Returns:
+        int: Number of entries removed
+    """
+    if META_CACHE_PATH in ('', '0'):
+        return 0
+
+    suffix = f":{args!r}"
+    try:
+        conn = _connection()
+        removed = conn.execute(
+            "DELETE FROM meta WHERE substr(key, 1, ?) = ? AND substr(key, -?) != ?",
+            (len(namespace) + 1, f"{namespace}:", len(suffix), suffix)
+        ).rowcount
+        conn.commit()
+    except Exception as e:
+        logger.warning(f"Metadata cache cleanup failed: {str(e)}")
+        return 0
+
+    if removed:
+        logger.info(f"Dropped {removed} stale '{namespace}' cache entries")
+    return removed
+
+
+def clear_cache():
+    """Delete every entry and shrink the file (e.g. when the library is reset)"""
+    if META_CACHE_PATH in ('', '0'):
+        return
+
+    try:
+        conn = _connection()
+        conn.execute("DELETE FROM meta")
+        conn.commit()
+        conn.execute("VACUUM")
+    except Exception as e:
+        logger.warning(f"Metadata cache clear failed: {str(e)}")
+
+
+def cached_by_stat(namespace):
+    """
+    Decorator for methods called as method(self, image_path, *args, **kwargs)
+
+    The result is cached per (path, mtime, size, args, kwargs); a modified
+    file gets a new key, so stale entries are never returned.
+
+    Args:
+        namespace: Cache namespace for this method
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, image_path, *args, **kwargs):
+            key = cache_key(namespace, image_path, *args, **kwargs)
+            hit, value = cache_get(key)
+            if hit:
+                return value
+
+            value = method(self, image_path, *args, **kwargs)
+            cache_put(key, value)
+            return value
+        return wrapper
+    return decorator
@@ -4,15 +4,46 @@ Phase 2.7
 """
 
 from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
+from PIL.ExifTags import TAGS
 from datetime import datetime
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import os
+
+from .meta_cache import cached_by_stat
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# EXIF sub-IFDs (getexif() only returns IFD0; these hold the camera fields and GPS)
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+
+# GPS IFD tag ids
+GPS_LATITUDE_REF = 1
+GPS_LATITUDE = 2
+GPS_LONGITUDE_REF = 3
+GPS_LONGITUDE = 4
+
+# Quality metrics are computed at 1/4 scale (blur/brightness/contrast barely
+# change with resolution, pixel traffic drops 16x)
+QUALITY_DOWNSCALE = 4
+
+# Laplacian variance at which sharpness reaches 1.0. The full-resolution scale
+# was 500; downscaling packs edges into fewer pixels, and on the sample photos
+# the 1/4-scale variance measured 3.6-6.7x the full-resolution one (about 5x
+# typical, INTER_AREA and JPEG draft decoding alike), hence 500 * 5
+SHARPNESS_VAR_SCALE = 500 * 5
+
+# Season per month (index month - 1, Northern Hemisphere)
+SEASON_BY_MONTH = ('winter', 'winter', 'spring', 'spring', 'spring', 'summer',
+                   'summer', 'summer', 'autumn', 'autumn', 'autumn', 'winter')
+
+# Time of day per hour: night 0-4, morning 5-11, afternoon 12-16, evening 17-20, night 21-23
+TIME_OF_DAY_BY_HOUR = ('night',) * 5 + ('morning',) * 7 + ('afternoon',) * 5 + ('evening',) * 4 + ('night',) * 3
+
 
 class MetadataService:
     """Handle metadata extraction and enrichment"""
@@ -20,12 +51,16 @@ class MetadataService:
     def __init__(self):
         pass
     
-    def extract_exif(self, image_path):
+    @cached_by_stat('exif')
+    def extract_exif(self, image_path, with_quality=True):
         """
-        Extract EXIF metadata from image
+        Extract EXIF metadata from image (cached per file version)
         
         Args:
             image_path: Path to image file
+            with_quality: Also decode the image for quality metrics. Callers
+                that already hold the decoded frame pass False and use
+                calculate_frame_quality instead (EXIF is header-only).
         
         Returns:
             dict: EXIF metadata including date, camera info, GPS, etc.
@@ -33,16 +68,18 @@ class MetadataService:
         try:
             logger.info(f"Extracting EXIF from: {image_path}")
             
+            # Opened once: EXIF and size come from the header, and the same
+            # handle is decoded (straight to grayscale) for the quality metrics
             image = Image.open(image_path)
             exif_data = {}
             
-            # Get EXIF data
-            exif = image._getexif()
+            # Get EXIF data (IFD0 plus the Exif sub-IFD, as _getexif() merged them)
+            exif = image.getexif()
             
-            if exif:
-                for tag_id, value in exif.items():
-                    tag = TAGS.get(tag_id, tag_id)
-                    exif_data[tag] = value
+            for tag_id, value in list(exif.items()) + list(exif.get_ifd(EXIF_IFD).items()):
+                tag = TAGS.get(tag_id, tag_id)
+                exif_data[tag] = value
+            exif_data['GPSInfo'] = exif.get_ifd(GPS_IFD)
             
             # Parse important fields
             metadata = {
@@ -65,7 +102,8 @@ class MetadataService:
                 metadata.update(self._get_temporal_context(metadata['date_taken']))
             
             # Add image quality metrics
-            metadata.update(self._calculate_image_quality(image_path))
+            if with_quality:
+                metadata.update(self._calculate_image_quality(self._load_quality_gray(image)))
             
             logger.info(f"EXIF extracted successfully")
             
@@ -76,6 +114,27 @@ class MetadataService:
             # Return minimal metadata
             return self._get_minimal_metadata(image_path)
     
+    def extract_exif_many(self, image_paths, max_workers=None):
+        """
+        Extract EXIF metadata for several images on a thread pool
+        
+        Pillow's JPEG decoder and the OpenCV quality reductions release
+        the GIL, so threads overlap the per-file decode work.
+        
+        Args:
+            image_paths: List of image paths
+            max_workers: Thread count (defaults to the CPU count)
+        
+        Returns:
+            list: Metadata dict per path, in the same order
+        """
+        if not image_paths:
+            return []
+        
+        max_workers = max_workers or os.cpu_count() or 4
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(image_paths))) as executor:
+            return list(executor.map(self.extract_exif, image_paths))
+    
     def _parse_datetime(self, datetime_str):
         """
         Parse EXIF datetime string to datetime object
@@ -89,13 +148,23 @@ class MetadataService:
         if not datetime_str:
             return None
         
+        s = str(datetime_str)
+        
+        # EXIF datetime format: YYYY:MM:DD HH:MM:SS. Fixed layout, so slice it
+        # directly instead of going through strptime's regex machinery
+        if len(s) == 19 and s[4] == ':' and s[7] == ':' and s[10] == ' ' and s[13] == ':' and s[16] == ':':
+            try:
+                return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                                int(s[11:13]), int(s[14:16]), int(s[17:19]))
+            except ValueError:
+                pass  # e.g. '0000:00:00 00:00:00' from cameras with no clock set
+        
         try:
-            # EXIF datetime format: YYYY:MM:DD HH:MM:SS
-            return datetime.strptime(str(datetime_str), '%Y:%m:%d %H:%M:%S')
+            return datetime.strptime(s, '%Y:%m:%d %H:%M:%S')
         except:
             try:
                 # Try alternative format
-                return datetime.strptime(str(datetime_str), '%Y-%m-%d %H:%M:%S')
+                return datetime.strptime(s, '%Y-%m-%d %H:%M:%S')
             except:
                 logger.warning(f"Could not parse datetime: {datetime_str}")
                 return None
@@ -114,19 +183,14 @@ class MetadataService:
             return None
         
         try:
-            gps_data = {}
-            for tag_id, value in gps_info.items():
-                tag = GPSTAGS.get(tag_id, tag_id)
-                gps_data[tag] = value
-            
-            # Extract coordinates
-            lat = self._convert_to_degrees(gps_data.get('GPSLatitude'))
-            lon = self._convert_to_degrees(gps_data.get('GPSLongitude'))
+            # Extract coordinates (looked up by tag id; only these four are used)
+            lat = self._convert_to_degrees(gps_info.get(GPS_LATITUDE))
+            lon = self._convert_to_degrees(gps_info.get(GPS_LONGITUDE))
             
             # Apply reference (N/S, E/W)
-            if gps_data.get('GPSLatitudeRef') == 'S':
+            if gps_info.get(GPS_LATITUDE_REF) == 'S':
                 lat = -lat
-            if gps_data.get('GPSLongitudeRef') == 'W':
+            if gps_info.get(GPS_LONGITUDE_REF) == 'W':
                 lon = -lon
             
             if lat and lon:
@@ -165,27 +229,9 @@ class MetadataService:
                 'day': None
             }
         
-        # Determine season (Northern Hemisphere)
-        month = date_taken.month
-        if month in [12, 1, 2]:
-            season = 'winter'
-        elif month in [3, 4, 5]:
-            season = 'spring'
-        elif month in [6, 7, 8]:
-            season = 'summer'
-        else:
-            season = 'autumn'
-        
-        # Determine time of day
-        hour = date_taken.hour
-        if 5 <= hour < 12:
-            time_of_day = 'morning'
-        elif 12 <= hour < 17:
-            time_of_day = 'afternoon'
-        elif 17 <= hour < 21:
-            time_of_day = 'evening'
-        else:
-            time_of_day = 'night'
+        # Season (Northern Hemisphere) and time of day by table lookup
+        season = SEASON_BY_MONTH[date_taken.month - 1]
+        time_of_day = TIME_OF_DAY_BY_HOUR[date_taken.hour]
         
         return {
             'season': season,
@@ -196,29 +242,71 @@ class MetadataService:
             'weekday': date_taken.strftime('%A')
         }
     
-    def _calculate_image_quality(self, image_path):
+    def _load_quality_gray(self, image):
+        """
+        Decode an opened PIL image to grayscale at 1/QUALITY_DOWNSCALE size
+        
+        For JPEGs, draft() makes libjpeg decode at reduced scale directly,
+        so the full-resolution frame is never built.
+        
+        Args:
+            image: PIL image (header read, not yet decoded)
+        
+        Returns:
+            numpy.array: uint8 grayscale image
+        """
+        target = (max(1, image.width // QUALITY_DOWNSCALE), max(1, image.height // QUALITY_DOWNSCALE))
+        image.draft('L', target)
+        gray = np.asarray(image.convert('L'))
+        
+        # Formats without draft support decode at full size
+        if gray.shape[1] >= 2 * target[0]:
+            gray = cv2.resize(gray, target, interpolation=cv2.INTER_AREA)
+        
+        return gray
+    
+    def calculate_frame_quality(self, image):
+        """
+        Image quality metrics from an already-decoded RGB frame
+        
+        Same scale and metrics as extract_exif's own quality pass.
+        
+        Args:
+            image: RGB numpy array
+        
+        Returns:
+            dict: Quality metrics (blur, brightness, contrast, etc.)
+        """
+        height, width = image.shape[:2]
+        small = cv2.resize(
+            image,
+            (max(1, width // QUALITY_DOWNSCALE), max(1, height // QUALITY_DOWNSCALE)),
+            interpolation=cv2.INTER_AREA
+        )
+        return self._calculate_image_quality(cv2.cvtColor(small, cv2.COLOR_RGB2GRAY))
+    
+    def _calculate_image_quality(self, gray):
         """
         Calculate image quality metrics
         
         Args:
-            image_path: Path to image
+            gray: Grayscale image as a uint8 numpy array
         
         Returns:
             dict: Quality metrics (blur, brightness, contrast, etc.)
         """
         try:
-            image = cv2.imread(str(image_path))
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # 1. Sharpness (Laplacian variance)
-            laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-            sharpness = min(laplacian_var / 500, 1.0)
+            # 1. Sharpness (Laplacian variance). int16 holds the Laplacian of
+            # uint8 input exactly; scaled for the downscaled frame
+            _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+            laplacian_var = float(laplacian_std[0, 0]) ** 2
+            sharpness = min(laplacian_var / SHARPNESS_VAR_SCALE, 1.0)
             
-            # 2. Brightness
-            brightness = np.mean(gray) / 255.0
-            
-            # 3. Contrast (standard deviation)
-            contrast = np.std(gray) / 128.0
+            # 2-3. Brightness and contrast (standard deviation), both moments
+            # from one pass over the image
+            gray_mean, gray_std = cv2.meanStdDev(gray)
+            brightness = float(gray_mean[0, 0]) / 255.0
+            contrast = float(gray_std[0, 0]) / 128.0
             
             # 4. Overall quality score
             quality_score = (sharpness * 0.4 + 
@@ -322,4 +410,18 @@ def get_metadata_service():
     global _metadata_service
     if _metadata_service is None:
         _metadata_service = MetadataService()
-    return _metadata_service
\ No newline at end of file
+    return _metadata_service
+
+
+def extract_metadata(image_path, with_quality=True):
+    """
+    Module-level entry point for extract_exif (submitted to the pipeline's metadata pool)
+    
+    Args:
+        image_path: Path to image file
+        with_quality: Also compute quality metrics (decodes the image)
+    
+    Returns:
+        dict: Same as MetadataService.extract_exif
+    """
+    return get_metadata_service().extract_exif(image_path, with_quality)
\ No newline at end of file
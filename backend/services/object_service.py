@@ -4,12 +4,21 @@ Phase 2.4 & 2.5
 """
 
 from ultralytics import YOLO
+import torch
 import cv2
 import numpy as np
-from collections import Counter
 import logging
+import os
 from pathlib import Path
 
+from .image_io import read_image
+from .meta_cache import cache_key, cache_get, cache_put
+
+try:
+    import openvino
+except ImportError:  # optional; CPU inference stays on the PyTorch model
+    openvino = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -18,28 +27,70 @@ class ObjectService:
     """Handle object detection and scene classification"""
     
     # Scene classification rules based on detected objects
-    OUTDOOR_INDICATORS = ['car', 'tree', 'bench', 'bicycle', 'motorcycle', 'airplane', 
-                          'bird', 'horse', 'dog', 'cat', 'truck', 'boat', 'traffic light']
+    OUTDOOR_INDICATORS = frozenset({'car', 'tree', 'bench', 'bicycle', 'motorcycle', 'airplane', 
+                                    'bird', 'horse', 'dog', 'cat', 'truck', 'boat', 'traffic light'})
+    
+    INDOOR_INDICATORS = frozenset({'chair', 'couch', 'tv', 'laptop', 'keyboard', 'mouse', 
+                                   'book', 'clock', 'vase', 'bed', 'dining table', 'toilet', 
+                                   'sink', 'refrigerator', 'microwave', 'oven'})
+    
+    BEACH_INDICATORS = frozenset({'umbrella', 'surfboard', 'boat'})
+    SPORTS_INDICATORS = frozenset({'sports ball', 'baseball bat', 'tennis racket', 'skateboard', 
+                                   'skis', 'snowboard', 'frisbee'})
+    FOOD_INDICATORS = frozenset({'bowl', 'cup', 'fork', 'knife', 'spoon', 'wine glass', 'cake', 
+                                 'pizza', 'donut', 'hot dog', 'sandwich'})
+    PARTY_INDICATORS = frozenset({'cake', 'wine glass', 'cup', 'donut'})
+    WORK_INDICATORS = frozenset({'laptop', 'keyboard', 'mouse', 'book'})
     
-    INDOOR_INDICATORS = ['chair', 'couch', 'tv', 'laptop', 'keyboard', 'mouse', 
-                        'book', 'clock', 'vase', 'bed', 'dining table', 'toilet', 
-                        'sink', 'refrigerator', 'microwave', 'oven']
+    # Rules are compiled into one bitmask per label (a bit per indicator set
+    # or single label a rule tests), so classify_scene does one dict lookup
+    # per object instead of a set operation per rule
+    (SCENE_OUTDOOR, SCENE_INDOOR, SCENE_FOOD, SCENE_BEACH, SCENE_SPORTS, SCENE_PARTY,
+     SCENE_WORK, SCENE_ROAD, SCENE_TABLE, SCENE_HOME, SCENE_LAPTOP, SCENE_CHAIR) = (1 << bit for bit in range(12))
     
-    BEACH_INDICATORS = ['umbrella', 'surfboard', 'boat']
-    SPORTS_INDICATORS = ['sports ball', 'baseball bat', 'tennis racket', 'skateboard', 
-                        'skis', 'snowboard', 'frisbee']
-    FOOD_INDICATORS = ['bowl', 'cup', 'fork', 'knife', 'spoon', 'wine glass', 'cake', 
-                      'pizza', 'donut', 'hot dog', 'sandwich']
-    PARTY_INDICATORS = ['cake', 'wine glass', 'cup', 'donut']
-    WORK_INDICATORS = ['laptop', 'keyboard', 'mouse', 'book']
+    SCENE_LABEL_FLAGS = {}
+    for _flag, _labels in (
+        (SCENE_OUTDOOR, OUTDOOR_INDICATORS), (SCENE_INDOOR, INDOOR_INDICATORS),
+        (SCENE_FOOD, FOOD_INDICATORS), (SCENE_BEACH, BEACH_INDICATORS),
+        (SCENE_SPORTS, SPORTS_INDICATORS), (SCENE_PARTY, PARTY_INDICATORS),
+        (SCENE_WORK, WORK_INDICATORS), (SCENE_ROAD, ('car', 'truck')),
+        (SCENE_TABLE, ('dining table',)), (SCENE_HOME, ('bed', 'couch')),
+        (SCENE_LAPTOP, ('laptop',)), (SCENE_CHAIR, ('chair',))
+    ):
+        for _label in _labels:
+            SCENE_LABEL_FLAGS[_label] = SCENE_LABEL_FLAGS.get(_label, 0) | _flag
+    del _flag, _labels, _label
     
-    def __init__(self, model_path='yolov8n.pt'):
+    # Basic color names, in the order _colors_to_names tests its rules
+    COLOR_NAMES = ('white', 'black', 'red', 'brown', 'green', 'blue', 'yellow', 'purple', 'orange', 'gray')
+    
+    def __init__(self, model_path='yolov8n.pt', use_tensorrt=None, use_openvino=None):
         """
         Initialize YOLO model
         
         Args:
             model_path: Path to YOLO model (yolov8n.pt for nano/fast)
+            use_tensorrt: Build/load an FP16 TensorRT engine when CUDA is available
+                (defaults to the LUMEO_USE_TENSORRT env var, on unless set to '0')
+            use_openvino: Build/load an INT8 OpenVINO model on CPU-only machines
+                (defaults to the LUMEO_YOLO_OPENVINO env var, on unless set to '0')
         """
+        if use_tensorrt is None:
+            use_tensorrt = os.getenv('LUMEO_USE_TENSORRT', '1') != '0'
+        if use_openvino is None:
+            use_openvino = os.getenv('LUMEO_YOLO_OPENVINO', '1') != '0'
+        
+        # FP16 inference halves activation bandwidth on GPU
+        self.half = torch.cuda.is_available()
+        
+        # Own CUDA stream, so YOLO overlaps CLIP running on the pipeline's
+        # CLIP thread instead of both serializing on the default stream
+        self.stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+        
+        # Class id -> label, filled from the first result (exported TensorRT /
+        # OpenVINO models only expose names once the predictor is set up)
+        self.class_names = None
+        
         try:
             logger.info(f"Loading YOLO model: {model_path}")
             self.model = YOLO(model_path)
@@ -47,6 +98,79 @@ class ObjectService:
         except Exception as e:
             logger.error(f"Failed to load YOLO model: {str(e)}")
             self.model = None
+            return
+        
+        if use_tensorrt and torch.cuda.is_available():
+            self._load_tensorrt_engine(model_path)
+        elif use_openvino and not torch.cuda.is_available() and openvino is not None:
+            self._load_openvino_model(model_path)
+    
+    def _load_tensorrt_engine(self, model_path):
+        """
+        Swap the eager PyTorch model for an FP16 TensorRT engine
+        
+        The engine is built once and cached next to the weights
+        (yolov8n.pt -> yolov8n.engine). Any failure keeps the PyTorch model.
+        
+        Args:
+            model_path: Path to the YOLO .pt weights
+        """
+        engine_path = Path(model_path).with_suffix('.engine')
+        
+        try:
+            if not engine_path.exists():
+                logger.info(f"Exporting YOLO to TensorRT FP16 engine: {engine_path}")
+                exported = self.model.export(
+                    format='engine',
+                    imgsz=640,
+                    half=True,
+                    dynamic=True,
+                    batch=16,
+                    verbose=False
+                )
+                engine_path = Path(exported)
+            
+            self.model = YOLO(str(engine_path), task='detect')
+            logger.info(f"Using TensorRT engine: {engine_path}")
+            
+        except Exception as e:
+            logger.warning(f"TensorRT engine unavailable, using PyTorch model: {str(e)}")
+    
+    def _load_openvino_model(self, model_path):
+        """
+        Swap the eager PyTorch model for an INT8 OpenVINO model on CPU
+        
+        INT8 uses VNNI dot-product instructions where the CPU has them. The
+        model is exported once (Ultralytics calibrates on its small COCO
+        sample set) and cached next to the weights as
+        yolov8n_int8_openvino_model/. Any failure keeps the PyTorch model.
+        
+        Args:
+            model_path: Path to the YOLO .pt weights
+        """
+        model_dir = Path(model_path).with_name(f"{Path(model_path).stem}_int8_openvino_model")
+        
+        try:
+            if not model_dir.exists():
+                logger.info(f"Exporting YOLO to OpenVINO INT8: {model_dir}")
+                self.model.export(format='openvino', int8=True, imgsz=640, verbose=False)
+            
+            self.model = YOLO(str(model_dir), task='detect')
+            logger.info(f"Using OpenVINO INT8 model: {model_dir}")
+            
+        except Exception as e:
+            logger.warning(f"OpenVINO model unavailable, using PyTorch model: {str(e)}")
+    
+    def warm_up(self):
+        """Run YOLO once on a blank frame so the first real request isn't slow"""
+        if self.model is None:
+            return
+        
+        try:
+            self.model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+            logger.info("YOLO model warmed up")
+        except Exception as e:
+            logger.warning(f"YOLO warm-up failed: {str(e)}")
     
     def detect_objects(self, image_path, conf_threshold=0.5):
         """
@@ -59,59 +183,130 @@ class ObjectService:
         Returns:
             list: List of detected objects with bounding boxes and colors
         """
+        logger.info(f"Detecting objects in: {image_path}")
+        
+        detected_objects = self.detect_objects_batch([image_path], conf_threshold)[0]
+        
+        logger.info(f"Detected {len(detected_objects)} objects")
+        
+        return detected_objects
+    
+    def detect_objects_batch(self, image_paths, conf_threshold=0.5, images=None, batch_size=16):
+        """
+        Detect objects in several images, batch_size images per YOLO call
+        
+        Args:
+            image_paths: List of image paths
+            conf_threshold: Confidence threshold (0-1)
+            images: Optional RGB arrays already decoded from image_paths
+                (None entries get no objects)
+            batch_size: Images per forward pass (the TensorRT engine is built for 16)
+        
+        Returns:
+            list: One list of detected objects per image path
+        """
         if self.model is None:
             logger.error("YOLO model not loaded")
+            return [[] for _ in image_paths]
+        
+        if not image_paths:
             return []
         
         try:
-            logger.info(f"Detecting objects in: {image_path}")
-            
-            # Run YOLO inference
-            results = self.model(image_path, conf=conf_threshold, verbose=False)
+            logger.info(f"Detecting objects in batch of {len(image_paths)} images")
             
-            # Load original image for color extraction
-            image = cv2.imread(str(image_path))
+            # Unchanged files keep their detections from an earlier run
+            keys = [cache_key('objects', path, conf_threshold) for path in image_paths]
+            batch_objects = [None] * len(image_paths)
+            for idx, key in enumerate(keys):
+                hit, objects = cache_get(key)
+                if hit:
+                    batch_objects[idx] = objects
             
-            detected_objects = []
-            
-            for result in results:
-                boxes = result.boxes
+            # Ultralytics reads numpy input as BGR, like cv2.imread. Decoding
+            # here (rather than passing paths) also gives the frames needed
+            # for color extraction without a second decode.
+            pending = []  # (index, frame) for images that still need YOLO
+            for idx, path in enumerate(image_paths):
+                if batch_objects[idx] is not None:
+                    continue
+                if images is None:
+                    frame = read_image(path)
+                elif images[idx] is not None:
+                    frame = cv2.cvtColor(images[idx], cv2.COLOR_RGB2BGR)
+                else:
+                    frame = None
                 
-                for box in boxes:
-                    # Get box coordinates
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    
-                    # Get class name and confidence
-                    class_id = int(box.cls[0])
-                    class_name = result.names[class_id]
-                    confidence = float(box.conf[0])
-                    
-                    # Extract dominant color from detected region
-                    dominant_color = self._extract_dominant_color(image, (x1, y1, x2, y2))
-                    color_name = self._color_to_name(dominant_color)
-                    
-                    obj_data = {
-                        'label': class_name,
-                        'confidence': round(confidence, 3),
-                        'bbox': {
-                            'x1': x1,
-                            'y1': y1,
-                            'x2': x2,
-                            'y2': y2
-                        },
-                        'dominant_color_rgb': dominant_color,
-                        'color_name': color_name
-                    }
-                    
-                    detected_objects.append(obj_data)
+                if frame is None:
+                    batch_objects[idx] = []
+                else:
+                    pending.append((idx, frame))
             
-            logger.info(f"Detected {len(detected_objects)} objects")
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                # YOLO returns one result per input image, in order. Inference
+                # and the copies back in _parse_result run on self.stream
+                # (a no-op context on CPU)
+                with torch.cuda.stream(self.stream):
+                    results = self.model([frame for _, frame in chunk], conf=conf_threshold, half=self.half, verbose=False)
+                    for (idx, frame), result in zip(chunk, results):
+                        batch_objects[idx] = self._parse_result(result, frame)
+                        cache_put(keys[idx], batch_objects[idx])
             
-            return detected_objects
+            return batch_objects
             
         except Exception as e:
-            logger.error(f"Error detecting objects: {str(e)}")
-            return []
+            logger.error(f"Error detecting objects in batch: {str(e)}")
+            return [[] for _ in image_paths]
+    
+    def _parse_result(self, result, image):
+        """
+        Convert a single YOLO result into detected object dicts
+        
+        Args:
+            result: Ultralytics result for one image
+            image: OpenCV image array used for color extraction
+        
+        Returns:
+            list: Detected objects with bounding boxes and colors
+        """
+        detected_objects = []
+        
+        # One device-to-host copy per field for all boxes, instead of three
+        # tensor -> Python conversions (each a sync on GPU) per box.
+        # tolist() gives plain ints/floats, so the dicts stay JSON-friendly.
+        boxes = result.boxes
+        if self.class_names is None:
+            self.class_names = tuple(result.names[i] for i in range(len(result.names)))
+        bboxes = [tuple(bbox) for bbox in boxes.xyxy.cpu().numpy().astype(np.int32).tolist()]
+        class_ids = boxes.cls.cpu().numpy().astype(np.int32).tolist()
+        confidences = boxes.conf.cpu().numpy().tolist()
+        
+        # Dominant color of each detected region, then all color names at once
+        dominant_colors = self._extract_dominant_colors(image, bboxes)
+        color_names = self._colors_to_names(dominant_colors)
+        
+        for (x1, y1, x2, y2), class_id, confidence, dominant_color, color_name in zip(
+            bboxes, class_ids, confidences, dominant_colors, color_names
+        ):
+            class_name = self.class_names[class_id]
+            
+            obj_data = {
+                'label': class_name,
+                'confidence': round(confidence, 3),
+                'bbox': {
+                    'x1': x1,
+                    'y1': y1,
+                    'x2': x2,
+                    'y2': y2
+                },
+                'dominant_color_rgb': dominant_color,
+                'color_name': color_name
+            }
+            
+            detected_objects.append(obj_data)
+        
+        return detected_objects
     
     def _extract_dominant_color(self, image, bbox):
         """
@@ -127,17 +322,13 @@ class ObjectService:
         try:
             x1, y1, x2, y2 = bbox
             
-            # Extract region
+            # Extract region (a view, no copy)
             region = image[y1:y2, x1:x2]
+            if region.size == 0:
+                return (128, 128, 128)
             
-            # Reshape to 2D array of pixels
-            pixels = region.reshape(-1, 3)
-            
-            # Calculate mean color
-            mean_color = np.mean(pixels, axis=0).astype(int)
-            
-            # Convert BGR to RGB
-            r, g, b = mean_color[2], mean_color[1], mean_color[0]
+            # Mean color in one SIMD pass over the uint8 pixels (BGR order)
+            b, g, r, _ = cv2.mean(region)
             
             return (int(r), int(g), int(b))
             
@@ -145,6 +336,54 @@ class ObjectService:
             logger.error(f"Error extracting color: {str(e)}")
             return (128, 128, 128)  # Default gray
     
+    def _extract_dominant_colors(self, image, bboxes):
+        """
+        Mean color of every bounding box in an image
+        
+        When the boxes together cover more pixels than the image (many or
+        overlapping detections), one integral image makes each box mean
+        four lookups; otherwise each box is averaged directly.
+        
+        Args:
+            image: OpenCV image array
+            bboxes: List of (x1, y1, x2, y2) tuples
+        
+        Returns:
+            list: (r, g, b) per box
+        """
+        if not bboxes:
+            return []
+        
+        height, width = image.shape[:2]
+        boxes = np.asarray(bboxes, dtype=np.int64)
+        x1, x2 = np.clip(boxes[:, 0], 0, width), np.clip(boxes[:, 2], 0, width)
+        y1, y2 = np.clip(boxes[:, 1], 0, height), np.clip(boxes[:, 3], 0, height)
+        areas = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+        
+        # int32 sums only hold up to ~8.4M pixels of uint8
+        fits_int32 = height * width * 255 < np.iinfo(np.int32).max
+        if not fits_int32 or areas.sum() <= height * width:
+            return [self._extract_dominant_color(image, bbox) for bbox in bboxes]
+        
+        try:
+            integral = cv2.integral(image, sdepth=cv2.CV_32S)
+            sums = (
+                integral[y2, x2].astype(np.int64) - integral[y1, x2]
+                - integral[y2, x1] + integral[y1, x1]
+            )
+            
+            colors = []
+            for (b, g, r), area in zip(sums, areas):
+                if area == 0:
+                    colors.append((128, 128, 128))
+                else:
+                    colors.append((int(r / area), int(g / area), int(b / area)))
+            return colors
+            
+        except Exception as e:
+            logger.error(f"Error extracting colors: {str(e)}")
+            return [(128, 128, 128)] * len(bboxes)
+    
     def _color_to_name(self, rgb):
         """
         Convert RGB to basic color name
@@ -155,30 +394,44 @@ class ObjectService:
         Returns:
             str: Color name
         """
-        r, g, b = rgb
-        
-        # Simple color classification
-        if r > 200 and g > 200 and b > 200:
-            return 'white'
-        elif r < 50 and g < 50 and b < 50:
-            return 'black'
-        elif r > g and r > b:
-            if r > 180:
-                return 'red'
-            else:
-                return 'brown'
-        elif g > r and g > b:
-            return 'green'
-        elif b > r and b > g:
-            return 'blue'
-        elif r > 150 and g > 150 and b < 100:
-            return 'yellow'
-        elif r > 150 and g < 100 and b > 150:
-            return 'purple'
-        elif r > 150 and g > 100 and b < 100:
-            return 'orange'
-        else:
-            return 'gray'
+        return self._colors_to_names([rgb])[0]
+    
+    def _colors_to_names(self, colors):
+        """
+        Convert many RGB colors to basic color names in one vectorized pass
+        
+        Args:
+            colors: List of (r, g, b) tuples
+        
+        Returns:
+            list: Color name per input color
+        """
+        if len(colors) == 0:
+            return []
+        
+        rgb = np.asarray(colors, dtype=np.int16).reshape(-1, 3)
+        r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        red_max = (r > g) & (r > b)
+        
+        # Simple color classification; np.select takes the first matching
+        # rule, like an if/elif chain
+        name_idx = np.select(
+            [
+                (r > 200) & (g > 200) & (b > 200),
+                (r < 50) & (g < 50) & (b < 50),
+                red_max & (r > 180),
+                red_max,
+                (g > r) & (g > b),
+                (b > r) & (b > g),
+                (r > 150) & (g > 150) & (b < 100),
+                (r > 150) & (g < 100) & (b > 150),
+                (r > 150) & (g > 100) & (b < 100),
+            ],
+            np.arange(9),
+            default=9
+        )
+        
+        return [self.COLOR_NAMES[idx] for idx in name_idx]
     
     def classify_scene(self, detected_objects):
         """
@@ -203,14 +456,19 @@ class ObjectService:
                 'confidence': 0.0
             }
         
-        # Extract object labels
-        labels = [obj['label'] for obj in detected_objects]
-        label_counts = Counter(labels)
+        # One pass: per-object counts for the scored sets, and the union of
+        # every label's bits for the presence rules
+        present = 0
+        outdoor_score = indoor_score = food_count = 0
+        for obj in detected_objects:
+            label_flags = self.SCENE_LABEL_FLAGS.get(obj['label'], 0)
+            if label_flags:
+                present |= label_flags
+                outdoor_score += bool(label_flags & self.SCENE_OUTDOOR)
+                indoor_score += bool(label_flags & self.SCENE_INDOOR)
+                food_count += bool(label_flags & self.SCENE_FOOD)
         
         # Determine indoor vs outdoor
-        outdoor_score = sum(1 for label in labels if label in self.OUTDOOR_INDICATORS)
-        indoor_score = sum(1 for label in labels if label in self.INDOOR_INDICATORS)
-        
         if outdoor_score > indoor_score:
             scene_type = 'outdoor'
         elif indoor_score > outdoor_score:
@@ -220,26 +478,26 @@ class ObjectService:
         
         # Determine specific location
         location = 'general'
-        if any(label in self.BEACH_INDICATORS for label in labels):
+        if present & self.SCENE_BEACH:
             location = 'beach'
-        elif 'car' in labels or 'truck' in labels:
+        elif present & self.SCENE_ROAD:
             location = 'road/parking'
-        elif 'dining table' in labels or any(label in self.FOOD_INDICATORS for label in labels):
+        elif present & self.SCENE_TABLE or food_count:
             location = 'dining'
-        elif 'bed' in labels or 'couch' in labels:
+        elif present & self.SCENE_HOME:
             location = 'home'
-        elif 'laptop' in labels and 'chair' in labels:
+        elif present & self.SCENE_LAPTOP and present & self.SCENE_CHAIR:
             location = 'office'
         
         # Determine activity
         activity = 'general'
-        if any(label in self.SPORTS_INDICATORS for label in labels):
+        if present & self.SCENE_SPORTS:
             activity = 'sports'
-        elif sum(1 for label in labels if label in self.FOOD_INDICATORS) >= 2:
+        elif food_count >= 2:
             activity = 'dining'
-        elif any(label in self.PARTY_INDICATORS for label in labels):
+        elif present & self.SCENE_PARTY:
             activity = 'celebration'
-        elif any(label in self.WORK_INDICATORS for label in labels):
+        elif present & self.SCENE_WORK:
             activity = 'working'
         
         # Calculate confidence based on number of relevant objects
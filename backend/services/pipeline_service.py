@@ -7,26 +7,110 @@ from .face_service import get_face_service
 from .emotion_service import get_emotion_service
 from .object_service import get_object_service
 from .clip_service import get_clip_service
-from .metadata_service import get_metadata_service
+from .metadata_service import get_metadata_service, extract_metadata
+from .meta_cache import cache_key, cache_get, cache_put, drop_stale
+from .image_io import difference_hash
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+import threading
+import numpy as np
 import logging
+import os
 from pathlib import Path
 import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Part of every cached result's key: bump when a model or a result field
+# changes so results from the old pipeline are no longer reused
+PIPELINE_VERSION = '2'
+
+# Length of a face_recognition encoding
+FACE_ENCODING_DIM = 128
+
+# A photo whose dHash is within this many bits of a recently analyzed one
+# (burst shots, light edits) reuses its CLIP embedding and objects; faces
+# and emotions are still computed per shot. 0 disables.
+DEDUP_MAX_DISTANCE = int(os.getenv('LUMEO_DEDUP_DISTANCE', '4'))
+
+# Recent photos kept for the near-duplicate check
+DEDUP_RECENT_PHOTOS = 512
+
+# Per-step timings kept for get_step_timings' percentiles
+TIMING_WINDOW = 1000
+
+
+class _StepTimer:
+    """Wall time per pipeline step in microseconds; call lap() as each step ends"""
+    
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter_ns()
+    
+    def lap(self, step):
+        now = time.perf_counter_ns()
+        self.timings[step] = (now - self._last) // 1000
+        self._last = now
+
 
 class AnalysisPipeline:
-    """Orchestrate all photo analysis services"""
+    """
+    Orchestrate all photo analysis services
+    
+    Each service (and its model weights) is loaded on first use, so callers
+    that only need e.g. reprocess_faces_only never load CLIP or YOLO.
+    """
     
     def __init__(self):
-        self.face_service = get_face_service()
-        self.emotion_service = get_emotion_service()
-        self.object_service = get_object_service()
-        self.clip_service = get_clip_service()
-        self.metadata_service = get_metadata_service()
+        # dHash -> CLIP embedding / objects of recently analyzed photos
+        self._recent_photos = OrderedDict()
+        self._recent_photos_lock = threading.Lock()
+        # step -> recent durations (microseconds) of processed photos
+        self._step_timings = {}
+        self._step_timings_lock = threading.Lock()
+        # Results cached by an earlier PIPELINE_VERSION can't be hit again
+        drop_stale('pipeline', PIPELINE_VERSION)
+    
+    @cached_property
+    def face_service(self):
+        return get_face_service()
+    
+    @cached_property
+    def emotion_service(self):
+        return get_emotion_service()
     
-    def process_photo(self, photo_path, photo_id=None, progress_callback=None):
+    @cached_property
+    def object_service(self):
+        return get_object_service()
+    
+    @cached_property
+    def clip_service(self):
+        return get_clip_service()
+    
+    @cached_property
+    def metadata_service(self):
+        return get_metadata_service()
+    
+    def warm_up(self):
+        """
+        Load every service and run a dummy forward pass through the GPU models
+        
+        Services load in parallel (weight reads and CUDA setup release the
+        GIL), so start-up takes about as long as the slowest model.
+        """
+        services = ('face_service', 'emotion_service', 'object_service', 'clip_service', 'metadata_service')
+        with ThreadPoolExecutor(max_workers=len(services)) as executor:
+            list(executor.map(self._load_service, services))
+    
+    def _load_service(self, name):
+        """Load one service slot, warming up its model if it has one"""
+        service = getattr(self, name)
+        if service is not None and hasattr(service, 'warm_up'):
+            service.warm_up()
+    
+    def process_photo(self, photo_path, photo_id=None, progress_callback=None, precomputed=None):
         """
         Complete photo analysis pipeline
         
@@ -34,50 +118,101 @@ class AnalysisPipeline:
             photo_path: Path to photo file
             photo_id: Optional photo ID for tracking
             progress_callback: Optional function(step, message) for progress updates
+            precomputed: Optional dict with 'metadata' / 'objects' / 'clip_embedding' /
+                'image' / 'faces' already produced elsewhere, plus the frame's
+                'image_hash' and any 'dedup_source' (see process_photos_batch)
         
         Returns:
             dict: Complete analysis results
         """
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
+        timer = _StepTimer()
+        precomputed = precomputed or {}
+        # One str for every service (and their cache keys) instead of a
+        # conversion per call when a Path is passed in
+        photo_path = str(photo_path)
+        
+        # Unchanged file, same pipeline: reuse the stored analysis
+        result_key = cache_key('pipeline', photo_path, PIPELINE_VERSION)
+        hit, cached = cache_get(result_key)
+        if hit:
+            logger.info(f"=== Reusing cached analysis for photo: {photo_path} ===")
+            self._progress(progress_callback, 8, "Complete!")
+            return {**cached, 'photo_id': photo_id, 'photo_path': photo_path}
         
         logger.info(f"=== Starting pipeline for photo: {photo_path} ===")
         
         results = {
             'photo_id': photo_id,
-            'photo_path': str(photo_path),
+            'photo_path': photo_path,
             'analysis_complete': False,
-            'error': None
+            'error': None,
+            'errors': {}  # step name -> error, for model stages that failed on their own
         }
         
         try:
+            # Decode once; quality, faces, emotions, objects and CLIP all
+            # read the same frame
+            if 'image' in precomputed:
+                image = precomputed['image']
+            else:
+                image = self.face_service.load_image(photo_path)
+            
+            # Near-duplicates are resolved by process_photos_batch before the
+            # models run; a photo analyzed fresh is remembered by its hash
+            image_hash = precomputed.get('image_hash')
+            if 'dedup_source' in precomputed:
+                results['dedup_source'] = precomputed['dedup_source']
+                logger.info(f"✓ Near-duplicate of {results['dedup_source']}, reusing CLIP and objects")
+            timer.lap('decode')
+            
             # Step 1: Extract Metadata (2-3 seconds)
             self._progress(progress_callback, 1, "Extracting metadata...")
-            metadata = self.metadata_service.extract_exif(photo_path)
+            if 'metadata' in precomputed:
+                metadata = precomputed['metadata']
+            elif image is not None:
+                metadata = self.metadata_service.extract_exif(photo_path, False)  # with_quality; quality comes from the frame below
+                metadata.update(self.metadata_service.calculate_frame_quality(image))
+            else:
+                metadata = self.metadata_service.extract_exif(photo_path)
             results['metadata'] = metadata
             logger.info(f"✓ Metadata extracted: {metadata.get('date_taken', 'No date')}")
+            timer.lap('metadata')
             
             # Step 2: Detect Faces (3-5 seconds)
             self._progress(progress_callback, 2, "Detecting faces...")
-            face_encodings, face_locations, quality_scores = self.face_service.detect_faces(photo_path)
+            if 'faces' in precomputed:
+                face_encodings, face_locations, quality_scores = precomputed['faces']
+            elif image is not None:
+                face_encodings, face_locations, quality_scores = self._safe_step(
+                    results, 'faces', ([], [], []),
+                    self.face_service.detect_faces, photo_path, image=image
+                )
+            else:
+                face_encodings, face_locations, quality_scores = [], [], []
             
             results['faces'] = []
             results['face_count'] = len(face_encodings)
+            results['face_encodings'] = _encoding_matrix(face_encodings)
             
             logger.info(f"✓ Detected {len(face_encodings)} faces")
+            timer.lap('faces')
             
             # Step 3: Detect Emotions for Each Face (2-4 seconds per face)
             if face_encodings:
                 self._progress(progress_callback, 3, f"Analyzing emotions for {len(face_encodings)} faces...")
                 
-                face_emotions = []
-                for idx, (encoding, location, quality) in enumerate(zip(face_encodings, face_locations, quality_scores)):
-                    emotion_data = self.emotion_service.detect_emotion(photo_path, location)
-                    
-                    face_emotions.append(emotion_data)
-                    
+                # All faces of the photo go through the emotion model together
+                face_emotions = self._safe_step(
+                    results, 'emotions', [None] * len(face_locations),
+                    self.emotion_service.detect_emotions_batch, image, face_locations, photo_path
+                )
+                
+                for idx, (location, quality, emotion_data) in enumerate(zip(
+                    face_locations, quality_scores, face_emotions
+                )):
                     results['faces'].append({
-                        'face_index': idx,
-                        'encoding': encoding.tolist(),  # Convert numpy to list for JSON
+                        'face_index': idx,  # row in results['face_encodings']
                         'location': location,
                         'quality_score': quality,
                         'emotion': emotion_data
@@ -96,14 +231,22 @@ class AnalysisPipeline:
                     'mood_score': 0.0,
                     'face_count': 0
                 }
+            timer.lap('emotions')
             
             # Step 4: Detect Objects (3-5 seconds)
             self._progress(progress_callback, 4, "Detecting objects...")
-            detected_objects = self.object_service.detect_objects(photo_path)
+            if 'objects' in precomputed:
+                detected_objects = precomputed['objects']
+            else:
+                detected_objects = self._safe_step(
+                    results, 'objects', [[]],
+                    self.object_service.detect_objects_batch, [photo_path], images=[image]
+                )[0]
             results['objects'] = detected_objects
             results['object_count'] = len(detected_objects)
             
             logger.info(f"✓ Detected {len(detected_objects)} objects")
+            timer.lap('objects')
             
             # Step 5: Classify Scene (< 1 second)
             self._progress(progress_callback, 5, "Classifying scene...")
@@ -115,17 +258,26 @@ class AnalysisPipeline:
             # Step 6: Extract Clothing Colors (< 1 second)
             clothing_colors = self.object_service.get_clothing_colors(detected_objects)
             results['clothing_colors'] = clothing_colors
+            timer.lap('scene')
             
             # Step 7: Generate CLIP Embedding (2-3 seconds)
             self._progress(progress_callback, 6, "Generating semantic embedding...")
-            clip_embedding = self.clip_service.encode_image(photo_path)
+            if 'clip_embedding' in precomputed:
+                clip_embedding = precomputed['clip_embedding']
+            else:
+                clip_embedding = self._safe_step(
+                    results, 'clip', [None],
+                    self.clip_service.encode_images, [photo_path], images=[image]
+                )[0]
             
             if clip_embedding is not None:
-                results['clip_embedding'] = clip_embedding.tolist()  # Convert to list for JSON
+                # fp16 array, the precision the halfvec column stores
+                results['clip_embedding'] = clip_embedding.astype(np.float16)
                 logger.info(f"✓ CLIP embedding generated")
             else:
                 results['clip_embedding'] = None
                 logger.warning("× CLIP embedding failed")
+            timer.lap('clip')
             
             # Step 8: Generate Caption (< 1 second)
             self._progress(progress_callback, 7, "Generating caption...")
@@ -138,26 +290,131 @@ class AnalysisPipeline:
             results['caption'] = caption
             
             logger.info(f"✓ Caption: {caption[:100]}...")
+            timer.lap('caption')
             
-            # Mark as complete
-            results['analysis_complete'] = True
+            # The CLIP embedding marks a photo as processed (app.py selects
+            # photos without one), so without it the analysis is incomplete:
+            # nothing gets saved and the next run retries the whole photo
+            if results['clip_embedding'] is None:
+                results['error'] = results['errors'].get('clip', 'No CLIP embedding')
+            else:
+                results['analysis_complete'] = True
             
-            elapsed = time.time() - start_time
+            elapsed = (time.perf_counter_ns() - start_time) / 1e9
             results['processing_time'] = round(elapsed, 2)
+            results['timings'] = timer.timings
+            self._record_timings(timer.timings)
             
             logger.info(f"=== Pipeline complete in {elapsed:.2f}s ===")
             
+            # Results with a failed stage aren't cached or reused, so a later
+            # run computes them again
+            if results['analysis_complete'] and not results['errors']:
+                cache_put(result_key, results)
+                if image_hash is not None:
+                    self._remember_photo(image_hash, results)
+            
             self._progress(progress_callback, 8, "Complete!")
             
         except Exception as e:
-            logger.error(f"Pipeline error: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Pipeline error: {str(e)}", extra={'photo_path': photo_path})
             results['error'] = str(e)
             results['analysis_complete'] = False
         
         return results
     
+    def _record_timings(self, timings):
+        """Add one photo's step timings to the rolling window"""
+        with self._step_timings_lock:
+            for step, micros in timings.items():
+                window = self._step_timings.get(step)
+                if window is None:
+                    window = self._step_timings[step] = deque(maxlen=TIMING_WINDOW)
+                window.append(micros)
+    
+    def get_step_timings(self):
+        """
+        Per-step latency over the last TIMING_WINDOW processed photos
+        
+        Returns:
+            dict: step -> {'p50_ms', 'p95_ms', 'count'}
+        """
+        with self._step_timings_lock:
+            windows = {step: np.array(window) for step, window in self._step_timings.items()}
+        
+        stats = {}
+        for step, micros in windows.items():
+            p50, p95 = np.percentile(micros, [50, 95]) / 1000.0
+            stats[step] = {'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1), 'count': len(micros)}
+        return stats
+    
+    def _find_near_duplicate(self, image_hash):
+        """Most recent photo within DEDUP_MAX_DISTANCE bits of image_hash, or None"""
+        with self._recent_photos_lock:
+            for recent_hash, recent in reversed(self._recent_photos.items()):
+                if (recent_hash ^ image_hash).bit_count() <= DEDUP_MAX_DISTANCE:
+                    return recent
+        return None
+    
+    def _dedup_sources(self, hashes):
+        """
+        Where each frame of a chunk gets its CLIP embedding and objects from
+        
+        Args:
+            hashes: dHash per frame (None where the frame isn't checked)
+        
+        Returns:
+            list: Per frame, None (run the models), the offset of an earlier
+                frame in the chunk, or a recent photo kept by _remember_photo
+        """
+        sources = []
+        for offset, image_hash in enumerate(hashes):
+            source = None
+            if image_hash is not None:
+                # Burst shots usually share a chunk: match earlier frames first
+                source = next((
+                    earlier for earlier in range(offset)
+                    if sources[earlier] is None and hashes[earlier] is not None
+                    and (hashes[earlier] ^ image_hash).bit_count() <= DEDUP_MAX_DISTANCE
+                ), None)
+                if source is None:
+                    source = self._find_near_duplicate(image_hash)
+            sources.append(source)
+        return sources
+    
+    def _remember_photo(self, image_hash, results):
+        """Keep a photo's reusable results for the near-duplicate check"""
+        with self._recent_photos_lock:
+            self._recent_photos[image_hash] = {
+                'photo_id': results['photo_id'],
+                'photo_path': results['photo_path'],
+                'objects': results['objects'],
+                'clip_embedding': results['clip_embedding']
+            }
+            self._recent_photos.move_to_end(image_hash)
+            while len(self._recent_photos) > DEDUP_RECENT_PHOTOS:
+                self._recent_photos.popitem(last=False)
+    
+    def _safe_step(self, results, name, default, fn, *args, **kwargs):
+        """
+        Run one model stage; on failure record it and carry on with default
+        
+        The photo is still indexed from the stages that worked (e.g. CLIP and
+        objects without faces). A failed CLIP stage leaves the photo
+        incomplete instead, so it is retried rather than saved twice.
+        
+        Args:
+            results: The photo's results dict (error goes in results['errors'])
+            name: Stage name
+            default: Value returned if the stage fails
+        """
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Pipeline step '{name}' failed: {str(e)}", extra={'photo_path': results['photo_path']})
+            results['errors'][name] = str(e)
+            return default
+    
     def _progress(self, callback, step, message):
         """Helper to call progress callback if provided"""
         if callback:
@@ -168,6 +425,9 @@ class AnalysisPipeline:
         """
         Process multiple photos
         
+        Runs through process_photos_batch, so faces, objects and CLIP each
+        get one batched model call per chunk instead of one per photo.
+        
         Args:
             photo_paths: List of photo paths
             progress_callback: Optional function(photo_index, total, step, message)
@@ -175,20 +435,153 @@ class AnalysisPipeline:
         Returns:
             list: List of analysis results
         """
-        results = []
+        return self.process_photos_batch(photo_paths, progress_callback=progress_callback)
+    
+    def process_photos_batch(self, photo_paths, photo_ids=None, batch_size=16, progress_callback=None):
+        """
+        Process photos in chunks, running YOLO and CLIP as concurrent batched forward passes
+        
+        EXIF extraction for every photo is submitted to a thread pool up
+        front so it runs while the models are busy. Each
+        chunk is decoded once, in the background while the previous chunk is
+        on the models, and the frames are shared by YOLO, CLIP and faces.
+        Frames within DEDUP_MAX_DISTANCE dHash bits of a recent or earlier
+        frame skip YOLO and CLIP and reuse that photo's results.
+        
+        Args:
+            photo_paths: List of photo paths
+            photo_ids: Optional list of photo IDs (same order as photo_paths)
+            batch_size: Photos per batched model call (keep <= 16)
+            progress_callback: Optional function(photo_index, total, step, message)
+        
+        Returns:
+            list: Analysis results, in the same order as photo_paths
+        """
+        if photo_ids is None:
+            photo_ids = [None] * len(photo_paths)
         total = len(photo_paths)
         
+        # Photos analyzed before (and unchanged since) skip the models; the
+        # rest go through the batched path below
+        cached_results = {}
         for idx, photo_path in enumerate(photo_paths):
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Processing photo {idx + 1}/{total}")
-            logger.info(f"{'='*60}\n")
-            
-            def batch_progress(step, message):
+            hit, cached = cache_get(cache_key('pipeline', str(photo_path), PIPELINE_VERSION))
+            if hit:
+                cached_results[idx] = {**cached, 'photo_id': photo_ids[idx], 'photo_path': str(photo_path)}
                 if progress_callback:
-                    progress_callback(idx + 1, total, step, message)
+                    progress_callback(idx + 1, total, 8, "Complete!")
+        
+        if cached_results:
+            logger.info(f"Reusing cached analysis for {len(cached_results)}/{len(photo_paths)} photos")
+            pending = [idx for idx in range(len(photo_paths)) if idx not in cached_results]
+            
+            def pending_progress(pending_index, _pending_total, step, message):
+                progress_callback(pending[pending_index - 1] + 1, total, step, message)
             
-            result = self.process_photo(photo_path, progress_callback=batch_progress)
-            results.append(result)
+            fresh = iter(self.process_photos_batch(
+                [photo_paths[idx] for idx in pending],
+                [photo_ids[idx] for idx in pending],
+                batch_size=batch_size,
+                progress_callback=pending_progress if progress_callback else None
+            ) if pending else [])
+            return [cached_results[idx] if idx in cached_results else next(fresh) for idx in range(len(photo_paths))]
+        
+        metadata_pool = _get_metadata_pool()
+        # Workers only parse EXIF headers; quality metrics are computed
+        # below from the frame already decoded for the models
+        metadata_futures = [metadata_pool.submit(extract_metadata, path, False) for path in photo_paths]
+        
+        results = []
+        
+        # Decode the next chunk in the background while the models run on
+        # the current one; every model then reads the same decoded frames
+        with ThreadPoolExecutor(max_workers=1) as decode_executor:
+            next_images = decode_executor.submit(self.face_service.load_images, photo_paths[:batch_size])
+            
+            for start in range(0, len(photo_paths), batch_size):
+                chunk_paths = photo_paths[start:start + batch_size]
+                chunk_ids = photo_ids[start:start + batch_size]
+                
+                chunk_images = next_images.result()
+                if start + batch_size < len(photo_paths):
+                    next_images = decode_executor.submit(
+                        self.face_service.load_images,
+                        photo_paths[start + batch_size:start + 2 * batch_size]
+                    )
+                
+                logger.info(f"Running batched inference on photos {start + 1}-{start + len(chunk_paths)}")
+                
+                # Near-duplicates (burst shots, light edits) of a recent photo
+                # or of an earlier frame here reuse its CLIP embedding and
+                # objects; only the other frames go through YOLO and CLIP
+                chunk_hashes = [
+                    difference_hash(image) if DEDUP_MAX_DISTANCE > 0 and image is not None else None
+                    for image in chunk_images
+                ]
+                sources = self._dedup_sources(chunk_hashes)
+                fresh = [offset for offset, source in enumerate(sources) if source is None]
+                fresh_paths = [chunk_paths[offset] for offset in fresh]
+                fresh_images = [chunk_images[offset] for offset in fresh]
+                
+                # CLIP runs on its own thread (and CUDA stream) while YOLO and
+                # face detection run here, so their GPU work is in flight
+                # together; torch releases the GIL during the forward passes
+                clip_future = _get_clip_executor().submit(
+                    self.clip_service.encode_images, fresh_paths, images=fresh_images
+                )
+                fresh_objects = self.object_service.detect_objects_batch(fresh_paths, images=fresh_images)
+                chunk_faces = self.face_service.detect_faces_batch(chunk_paths, images=chunk_images)
+                
+                chunk_objects = [None] * len(chunk_paths)
+                chunk_embeddings = [None] * len(chunk_paths)
+                for offset, objects, embedding in zip(fresh, fresh_objects, clip_future.result()):
+                    chunk_objects[offset] = objects
+                    chunk_embeddings[offset] = embedding
+                
+                for offset, source in enumerate(sources):
+                    if source is None:
+                        continue
+                    if isinstance(source, int):
+                        chunk_objects[offset] = chunk_objects[source]
+                        chunk_embeddings[offset] = chunk_embeddings[source]
+                    else:
+                        chunk_objects[offset] = source['objects']
+                        chunk_embeddings[offset] = source['clip_embedding']
+                
+                for offset, (photo_path, photo_id, objects, embedding, image, faces) in enumerate(zip(
+                    chunk_paths, chunk_ids, chunk_objects, chunk_embeddings, chunk_images, chunk_faces
+                )):
+                    precomputed = {
+                        'objects': objects,
+                        'clip_embedding': embedding,
+                        'image': image,
+                        'faces': faces
+                    }
+                    source = sources[offset]
+                    if source is None:
+                        precomputed['image_hash'] = chunk_hashes[offset]
+                    elif isinstance(source, int):
+                        precomputed['dedup_source'] = chunk_ids[source] or str(chunk_paths[source])
+                    else:
+                        precomputed['dedup_source'] = source['photo_id'] or source['photo_path']
+                    
+                    try:
+                        metadata = dict(metadata_futures[start + offset].result())
+                        if image is not None:
+                            metadata.update(self.metadata_service.calculate_frame_quality(image))
+                        precomputed['metadata'] = metadata
+                    except Exception as e:
+                        # Extraction failed in the pool; process_photo retries inline
+                        logger.warning(f"Metadata worker failed for {photo_path}: {str(e)}")
+                    
+                    photo_progress = None
+                    if progress_callback:
+                        def photo_progress(step, message, photo_index=start + offset + 1):
+                            progress_callback(photo_index, total, step, message)
+                    
+                    results.append(self.process_photo(
+                        photo_path, photo_id, progress_callback=photo_progress, precomputed=precomputed
+                    ))
         
         return results
     
@@ -200,22 +593,22 @@ class AnalysisPipeline:
             photo_path: Path to photo
         
         Returns:
-            dict: Face data only
+            dict: Face data only ('face_encodings' row i belongs to faces[i])
         """
         face_encodings, face_locations, quality_scores = self.face_service.detect_faces(photo_path)
         
         faces = []
-        for idx, (encoding, location, quality) in enumerate(zip(face_encodings, face_locations, quality_scores)):
+        for idx, (location, quality) in enumerate(zip(face_locations, quality_scores)):
             faces.append({
                 'face_index': idx,
-                'encoding': encoding.tolist(),
                 'location': location,
                 'quality_score': quality
             })
         
         return {
             'faces': faces,
-            'face_count': len(faces)
+            'face_count': len(faces),
+            'face_encodings': _encoding_matrix(face_encodings)
         }
     
     def reprocess_emotions_only(self, photo_path, face_locations):
@@ -229,10 +622,8 @@ class AnalysisPipeline:
         Returns:
             dict: Emotion data
         """
-        face_emotions = []
-        for location in face_locations:
-            emotion_data = self.emotion_service.detect_emotion(photo_path, location)
-            face_emotions.append(emotion_data)
+        image = self.face_service.load_image(photo_path)
+        face_emotions = self.emotion_service.detect_emotions_batch(image, face_locations, photo_path)
         
         photo_emotion = self.emotion_service.aggregate_photo_emotions(face_emotions)
         
@@ -245,24 +636,71 @@ class AnalysisPipeline:
         """
         Get statistics about the pipeline
         
+        Doesn't load anything: a service that hasn't been used (or warmed
+        up) yet reports not ready.
+        
         Returns:
             dict: Stats about loaded models and readiness
         """
+        loaded = self.__dict__
+        object_service = loaded.get('object_service')
+        clip_service = loaded.get('clip_service')
         return {
-            'face_service_ready': self.face_service is not None,
-            'emotion_service_ready': self.emotion_service is not None,
-            'object_service_ready': self.object_service.model is not None if self.object_service else False,
-            'clip_service_ready': self.clip_service.model is not None if self.clip_service else False,
-            'metadata_service_ready': self.metadata_service is not None
+            'face_service_ready': loaded.get('face_service') is not None,
+            'emotion_service_ready': loaded.get('emotion_service') is not None,
+            'object_service_ready': object_service.model is not None if object_service else False,
+            'clip_service_ready': clip_service.model is not None if clip_service else False,
+            'metadata_service_ready': loaded.get('metadata_service') is not None
         }
 
 
+def _encoding_matrix(face_encodings):
+    """A photo's face encodings as one contiguous (N, 128) float32 matrix"""
+    if not len(face_encodings):
+        return np.empty((0, FACE_ENCODING_DIM), dtype=np.float32)
+    return np.vstack(face_encodings).astype(np.float32, copy=False)
+
+
+# Single thread for process_photos_batch's CLIP pass, so it overlaps YOLO and
+# face detection on the calling thread
+_clip_executor = None
+
+def _get_clip_executor():
+    """Get or create the CLIP thread"""
+    global _clip_executor
+    if _clip_executor is None:
+        _clip_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clip')
+    return _clip_executor
+
+
+# Thread pool for EXIF extraction. Threads, not processes: file reads and
+# PIL's header parsing release the GIL, and spawned workers would re-import
+# app.py (loading every model and starting its background threads again).
+_metadata_pool = None
+_metadata_pool_lock = threading.Lock()
+
+def _get_metadata_pool():
+    """Get or create the metadata thread pool"""
+    global _metadata_pool
+    if _metadata_pool is None:
+        with _metadata_pool_lock:
+            if _metadata_pool is None:
+                _metadata_pool = ThreadPoolExecutor(
+                    max_workers=max(1, (os.cpu_count() or 2) // 2),
+                    thread_name_prefix='metadata'
+                )
+    return _metadata_pool
+
+
 # Singleton instance
 _pipeline = None
+_pipeline_lock = threading.Lock()
 
 def get_pipeline():
     """Get or create pipeline singleton"""
     global _pipeline
     if _pipeline is None:
-        _pipeline = AnalysisPipeline()
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = AnalysisPipeline()
     return _pipeline
\ No newline at end of file
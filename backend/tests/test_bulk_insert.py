@@ -0,0 +1,146 @@
+"""
+COPY encoding and small-batch fallback for services/bulk_insert.py (no database needed)
+
+Run from the backend directory: python -m pytest tests/test_bulk_insert.py
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import DetectedObject, FaceEmbedding
+from services.bulk_insert import bulk_insert, BULK_COPY_MIN_ROWS, COPY_NULL
+
+
+class RecordingCursor:
+    """Stands in for a psycopg2 cursor: keeps the COPY statement and stream"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def copy_expert(self, sql, file):
+        self.session.copy_sql = sql
+        self.session.copy_data = file.read()
+
+    def close(self):
+        self.session.cursor_closed = True
+
+
+class FakeSession:
+    """Just enough of a Session for bulk_insert"""
+
+    def __init__(self):
+        self.mappings = None
+        self.flushed = False
+        self.copy_sql = None
+        self.copy_data = None
+        self.cursor_closed = False
+
+    def bulk_insert_mappings(self, model, rows):
+        self.mappings = (model, rows)
+
+    def flush(self):
+        self.flushed = True
+
+    def connection(self):
+        dbapi = type('DBAPIConnection', (), {'cursor': lambda _: RecordingCursor(self)})()
+        return type('Connection', (), {'connection': dbapi})()
+
+
+def object_row(**overrides):
+    row = {
+        'photo_id': 'photo-1',
+        'label': 'car',
+        'confidence': 0.9,
+        'bbox_x1': 1, 'bbox_y1': 2, 'bbox_x2': 3, 'bbox_y2': 4,
+        'dominant_color_rgb': '(255, 0, 0)',
+        'color_name': 'red'
+    }
+    row.update(overrides)
+    return row
+
+
+def copy_records(session):
+    """COPY stream parsed back as CSV (one dict per row, by column name)"""
+    columns = session.copy_sql.split('(', 1)[1].split(')', 1)[0].split(', ')
+    return [dict(zip(columns, record)) for record in csv.reader(io.StringIO(session.copy_data))]
+
+
+def test_small_batch_uses_bulk_insert_mappings():
+    session = FakeSession()
+    rows = [object_row() for _ in range(BULK_COPY_MIN_ROWS - 1)]
+
+    assert bulk_insert(session, DetectedObject, rows) == len(rows)
+
+    assert session.mappings == (DetectedObject, rows)
+    assert session.copy_sql is None
+
+
+def test_large_batch_uses_copy():
+    session = FakeSession()
+    rows = [object_row() for _ in range(BULK_COPY_MIN_ROWS)]
+
+    assert bulk_insert(session, DetectedObject, rows) == len(rows)
+
+    assert session.mappings is None
+    assert session.flushed
+    assert session.cursor_closed
+    assert session.copy_sql.startswith('COPY detected_objects (')
+    assert f"NULL '{COPY_NULL}'" in session.copy_sql
+    assert len(copy_records(session)) == len(rows)
+
+
+def test_python_defaults_are_filled_in():
+    session = FakeSession()
+
+    bulk_insert(session, DetectedObject, [object_row()], min_copy_rows=1)
+
+    record = copy_records(session)[0]
+    assert record['created_at']  # datetime.utcnow default
+    assert 'object_id' not in record  # autoincrement left to the database
+
+
+def test_null_is_written_unquoted():
+    session = FakeSession()
+
+    bulk_insert(session, DetectedObject, [object_row(color_name=None, dominant_color_rgb='')], min_copy_rows=1)
+
+    # Unquoted \N is NULL to COPY; '' stays an empty string
+    assert f',,{COPY_NULL},' in session.copy_data
+    record = copy_records(session)[0]
+    assert record['color_name'] == COPY_NULL
+    assert record['dominant_color_rgb'] == ''
+
+
+def test_quotes_commas_and_newlines_round_trip():
+    session = FakeSession()
+    label = 'say "cheese", then\nsmile'
+
+    bulk_insert(session, DetectedObject, [object_row(label=label)], min_copy_rows=1)
+
+    assert '"say ""cheese"", then\nsmile"' in session.copy_data
+    assert copy_records(session)[0]['label'] == label
+
+
+def test_json_and_halfvec_literals():
+    session = FakeSession()
+    rows = [{
+        'photo_id': 'photo-1',
+        'cluster_id': 'cluster_1',
+        'embedding': np.array([0.5, -1.25, 2.0], dtype=np.float16),
+        'face_location': [10, 40, 50, 5],
+        'emotion': None
+    }]
+
+    bulk_insert(session, FaceEmbedding, rows, min_copy_rows=1)
+
+    record = copy_records(session)[0]
+    assert record['embedding'] == '[0.5,-1.25,2.0]'
+    assert json.loads(record['face_location']) == [10, 40, 50, 5]
+    assert record['emotion'] == COPY_NULL
@@ -0,0 +1,69 @@
+"""
+Sharpness calibration for the 1/4-scale quality pass (services/metadata_service.py)
+
+Scores from the downscaled frame are compared with the original
+full-resolution metric (Laplacian variance / 500) on the repo's sample photo
+and a blurred copy of it.
+
+Run from the backend directory: python -m pytest tests/test_image_quality.py
+"""
+
+import os
+import sys
+
+import cv2
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.metadata_service import MetadataService, SHARPNESS_VAR_SCALE
+
+SAMPLE_PHOTO = os.path.join(os.path.dirname(__file__), '..', 'uploads', 'test.jpg')
+
+
+def full_res_sharpness(rgb):
+    """The metric before quality moved to 1/4 scale"""
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+    return min(float(laplacian_std[0, 0]) ** 2 / 500, 1.0)
+
+
+@pytest.fixture(scope='module')
+def sharp():
+    return cv2.cvtColor(cv2.imread(SAMPLE_PHOTO), cv2.COLOR_BGR2RGB)
+
+
+@pytest.fixture(scope='module')
+def blurred(sharp):
+    return cv2.GaussianBlur(sharp, (0, 0), 2)
+
+
+@pytest.mark.parametrize('fixture', ['sharp', 'blurred'])
+def test_downscaled_sharpness_matches_full_resolution(fixture, request):
+    frame = request.getfixturevalue(fixture)
+
+    old = full_res_sharpness(frame)
+    new = MetadataService().calculate_frame_quality(frame)['sharpness']
+
+    assert new == pytest.approx(old, abs=0.05)
+
+
+def test_blurred_scores_below_sharp(sharp, blurred):
+    service = MetadataService()
+
+    assert full_res_sharpness(blurred) < full_res_sharpness(sharp)
+    assert service.calculate_frame_quality(blurred)['sharpness'] < service.calculate_frame_quality(sharp)['sharpness']
+
+
+def test_uncalibrated_divisor_inflates_sharpness(sharp):
+    # Guards the calibration itself: /500 on the small frame overshoots
+    small = cv2.resize(
+        cv2.cvtColor(sharp, cv2.COLOR_RGB2GRAY),
+        (sharp.shape[1] // 4, sharp.shape[0] // 4),
+        interpolation=cv2.INTER_AREA
+    )
+    _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(small, cv2.CV_16S))
+    laplacian_var = float(laplacian_std[0, 0]) ** 2
+
+    assert min(laplacian_var / 500, 1.0) > full_res_sharpness(sharp) + 0.2
+    assert laplacian_var / SHARPNESS_VAR_SCALE == pytest.approx(full_res_sharpness(sharp), abs=0.05)
@@ -0,0 +1,197 @@
+"""
+Per-file result cache (services/meta_cache.py)
+
+Run from the backend directory: python -m pytest tests/test_meta_cache.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import meta_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_db(tmp_path, monkeypatch):
+    """Fresh SQLite cache per test"""
+    monkeypatch.setattr(meta_cache, 'META_CACHE_PATH', str(tmp_path / 'meta_cache.db'))
+    monkeypatch.setattr(meta_cache._local, 'conn', None, raising=False)
+    yield
+    conn = getattr(meta_cache._local, 'conn', None)
+    if conn is not None:
+        conn.close()
+    meta_cache._local.conn = None
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / 'photo.jpg'
+    path.write_bytes(b'original bytes')
+    return path
+
+
+class CountingService:
+    """Decorated method that counts how often it really runs"""
+
+    def __init__(self):
+        self.calls = 0
+
+    @meta_cache.cached_by_stat('test')
+    def analyze(self, image_path, scale=1, mode='fast'):
+        self.calls += 1
+        return {'path': str(image_path), 'scale': scale, 'mode': mode}
+
+
+def test_miss_then_hit(photo):
+    service = CountingService()
+
+    first = service.analyze(str(photo))
+    second = service.analyze(str(photo))
+
+    assert first == second
+    assert service.calls == 1
+
+
+def test_modified_mtime_invalidates(photo):
+    service = CountingService()
+    service.analyze(str(photo))
+
+    st = os.stat(photo)
+    os.utime(photo, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    service.analyze(str(photo))
+
+    assert service.calls == 2
+
+
+def test_modified_size_invalidates(photo):
+    service = CountingService()
+    service.analyze(str(photo))
+
+    st = os.stat(photo)
+    photo.write_bytes(b'a different, longer payload')
+    os.utime(photo, ns=(st.st_atime_ns, st.st_mtime_ns))  # same mtime, new size
+    service.analyze(str(photo))
+
+    assert service.calls == 2
+
+
+def test_keyword_arguments_are_forwarded_and_keyed(photo):
+    service = CountingService()
+
+    assert service.analyze(str(photo), mode='slow') == {'path': str(photo), 'scale': 1, 'mode': 'slow'}
+    assert service.analyze(str(photo), mode='fast')['mode'] == 'fast'
+    assert service.calls == 2
+
+    # Same keywords in another order: same key
+    service.analyze(str(photo), scale=2, mode='slow')
+    service.analyze(str(photo), mode='slow', scale=2)
+    assert service.calls == 3
+
+
+def test_positional_arguments_are_keyed(photo):
+    service = CountingService()
+
+    service.analyze(str(photo), 1)
+    service.analyze(str(photo), 2)
+    service.analyze(str(photo), 2)
+
+    assert service.calls == 2
+
+
+def test_missing_file_is_not_cached(tmp_path):
+    missing = str(tmp_path / 'missing.jpg')
+
+    assert meta_cache.cache_key('test', missing) is None
+    assert meta_cache.cache_get(None) == (False, None)
+
+
+def test_disabled_cache_always_misses(photo, monkeypatch):
+    monkeypatch.setattr(meta_cache, 'META_CACHE_PATH', '0')
+    service = CountingService()
+
+    service.analyze(str(photo))
+    service.analyze(str(photo))
+
+    assert service.calls == 2
+
+
+def test_content_key_matches_copies(photo, tmp_path):
+    copy = tmp_path / 'copy.jpg'
+    copy.write_bytes(photo.read_bytes())
+    other = tmp_path / 'other.jpg'
+    other.write_bytes(b'other bytes')
+
+    key = meta_cache.content_key('clip', str(photo), 'model')
+
+    assert key == meta_cache.content_key('clip', str(copy), 'model')
+    assert key != meta_cache.content_key('clip', str(other), 'model')
+    assert key != meta_cache.content_key('clip', str(photo), 'other-model')
+
+
+def stored_keys():
+    return {row[0] for row in meta_cache._connection().execute("SELECT key FROM meta")}
+
+
+def test_prune_evicts_entries_past_max_age():
+    meta_cache.cache_put('old', 'value')
+    meta_cache._connection().execute("UPDATE meta SET stored_at = stored_at - 10 * 86400")
+    meta_cache.cache_put('new', 'value')
+
+    assert meta_cache.prune_cache(max_age_days=5) == 1
+    assert stored_keys() == {'new'}
+
+
+def test_prune_keeps_newest_entries_within_size_limit(monkeypatch):
+    monkeypatch.setattr(meta_cache.time, 'time', iter(range(1_000_000, 1_000_010)).__next__)
+    for name in ('first', 'second', 'third'):
+        meta_cache.cache_put(name, b'x' * 400_000)
+
+    assert meta_cache.prune_cache(max_mb=1, max_age_days=10_000) == 1
+    assert stored_keys() == {'second', 'third'}
+
+
+def test_writes_trigger_prune(monkeypatch):
+    monkeypatch.setattr(meta_cache, 'META_CACHE_PRUNE_EVERY', 2)
+    monkeypatch.setattr(meta_cache, '_writes', 0)
+    monkeypatch.setattr(meta_cache, 'META_CACHE_MAX_MB', 0)
+
+    meta_cache.cache_put('a', 'value')
+    meta_cache.cache_put('b', 'value')
+
+    assert stored_keys() == set()
+
+
+def test_drop_stale_removes_other_versions(photo):
+    current = meta_cache.cache_key('pipeline', str(photo), '2')
+    meta_cache.cache_put(meta_cache.cache_key('pipeline', str(photo), '1'), 'old result')
+    meta_cache.cache_put(current, 'result')
+    meta_cache.cache_put(meta_cache.cache_key('objects', str(photo), 0.5), 'objects')
+
+    assert meta_cache.drop_stale('pipeline', '2') == 1
+    assert meta_cache.cache_get(current) == (True, 'result')
+    assert len(stored_keys()) == 2
+
+
+def test_clear_cache_removes_everything(photo):
+    service = CountingService()
+    service.analyze(str(photo))
+
+    meta_cache.clear_cache()
+    service.analyze(str(photo))
+
+    assert service.calls == 2
+
+
+def test_cache_from_before_eviction_is_upgraded(tmp_path):
+    conn = meta_cache.sqlite3.connect(meta_cache.META_CACHE_PATH)
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value BLOB)")
+    conn.execute("INSERT INTO meta VALUES ('legacy', ?)", (meta_cache.pickle.dumps('value'),))
+    conn.commit()
+    conn.close()
+
+    assert meta_cache.cache_get('legacy') == (True, 'value')
+    # Legacy rows have no timestamp, so they are the first to go
+    assert meta_cache.prune_cache() == 1
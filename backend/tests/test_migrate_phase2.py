@@ -0,0 +1,143 @@
+"""
+Statement splitting for the Phase 2 migration (no database needed)
+
+Run from the backend directory: python -m pytest tests/test_migrate_phase2.py
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from migrate_phase2 import split_statements, convert_clip_embeddings, drop_non_hnsw_index
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'schema_phase2.sql')
+
+# Lines that begin a statement in schema_phase2.sql
+STATEMENT_START = re.compile(
+    r'^(CREATE TABLE|CREATE INDEX|ALTER TABLE|DROP INDEX|INSERT INTO|COMMENT ON)\b', re.MULTILINE
+)
+
+
+def load_statements():
+    with open(SCHEMA_PATH) as f:
+        return split_statements(f.read())
+
+
+def test_every_statement_in_schema_is_kept():
+    with open(SCHEMA_PATH) as f:
+        schema_sql = f.read()
+
+    expected = [match.group(0) for match in STATEMENT_START.finditer(schema_sql)]
+    statements = split_statements(schema_sql)
+
+    assert [STATEMENT_START.match(s).group(0) for s in statements] == expected
+
+
+def test_statement_after_comment_header_is_kept():
+    statements = split_statements(
+        "-- 1. Header\n"
+        "CREATE TABLE a (id INT);\n"
+        "\n"
+        "-- 2. Another header\n"
+        "--    continued\n"
+        "CREATE INDEX ix_a ON a(id);\n"
+    )
+
+    assert statements == ["CREATE TABLE a (id INT)", "CREATE INDEX ix_a ON a(id)"]
+
+
+def test_semicolon_in_comment_does_not_split_statement():
+    statements = split_statements(
+        "-- Converted elsewhere; see migrate_phase2.py\n"
+        "CREATE TABLE a (id INT);\n"
+    )
+
+    assert statements == ["CREATE TABLE a (id INT)"]
+
+
+def test_comment_only_chunks_are_dropped():
+    statements = split_statements(
+        "-- 7. Built elsewhere\n"
+        "--    (nothing to run here)\n"
+        ";\n"
+        "-- trailing comment\n"
+    )
+
+    assert statements == []
+
+
+def test_library_stats_created_before_insert():
+    statements = load_statements()
+
+    create = next(i for i, s in enumerate(statements) if s.startswith('CREATE TABLE IF NOT EXISTS library_stats'))
+    insert = next(i for i, s in enumerate(statements) if s.startswith('INSERT INTO library_stats'))
+
+    assert create < insert
+
+
+class RecordingCursor:
+    """Stands in for a psycopg2 cursor: records SQL, returns canned rows"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(' '.join(sql.split()))
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+
+def test_clip_conversion_drops_index_before_alter():
+    cursor = RecordingCursor([('vector',)])
+
+    convert_clip_embeddings(cursor)
+
+    drop = cursor.executed.index('DROP INDEX IF EXISTS idx_photos_clip_embedding')
+    alter = next(i for i, sql in enumerate(cursor.executed) if 'TYPE halfvec(512)' in sql)
+    assert drop < alter
+
+
+def test_clip_conversion_skips_halfvec_column():
+    cursor = RecordingCursor([('halfvec',)])
+
+    convert_clip_embeddings(cursor)
+
+    assert len(cursor.executed) == 1  # only the column type lookup
+
+
+def test_ivfflat_index_is_dropped_for_rebuild():
+    cursor = RecordingCursor([('CREATE INDEX idx_faces_embedding ON public.face_embeddings USING ivfflat (embedding)',)])
+
+    assert not drop_non_hnsw_index(cursor, 'face_embeddings', 'idx_faces_embedding')
+    assert cursor.executed[-1] == 'DROP INDEX IF EXISTS idx_faces_embedding'
+
+
+def test_hnsw_index_is_kept():
+    cursor = RecordingCursor([('CREATE INDEX idx_photos_clip_embedding ON public.photos USING hnsw (clip_embedding)',)])
+
+    assert drop_non_hnsw_index(cursor, 'photos', 'idx_photos_clip_embedding')
+    assert len(cursor.executed) == 1  # only the index lookup
+
+
+def test_partial_and_cluster_indexes_are_created():
+    statements = load_statements()
+
+    assert any(s.startswith('CREATE INDEX IF NOT EXISTS ix_photos_unprocessed') for s in statements)
+    assert any(s.startswith('CREATE INDEX IF NOT EXISTS ix_photo_clusters_cluster') for s in statements)
+
+
+def test_face_embedding_indexes_are_created():
+    statements = load_statements()
+
+    assert any(s.startswith('CREATE INDEX IF NOT EXISTS ix_face_embeddings_photo') for s in statements)
+    assert any(s.startswith('CREATE INDEX IF NOT EXISTS ix_face_embeddings_cluster') for s in statements)
+
+
+def test_face_location_is_converted_to_jsonb():
+    statements = load_statements()
+
+    assert any('ALTER COLUMN face_location TYPE JSONB' in s for s in statements)
@@ -0,0 +1,118 @@
+"""
+Near-duplicate reuse and CLIP failures in AnalysisPipeline.process_photos_batch
+
+The model services are replaced by recorders, so this checks which frames
+reach YOLO and CLIP without loading any weights.
+
+Run from the backend directory: python -m pytest tests/test_pipeline_dedup.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import meta_cache
+from services.pipeline_service import AnalysisPipeline
+
+
+class RecordingModels:
+    """Object, CLIP, face, emotion and metadata service in one recorder"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.yolo_paths = []
+        self.clip_paths = []
+
+    def load_images(self, paths):
+        return [self.frames[path] for path in paths]
+
+    def detect_objects_batch(self, paths, images=None):
+        self.yolo_paths.extend(paths)
+        return [[{'label': f'object in {path}', 'confidence': 0.9}] for path in paths]
+
+    def encode_images(self, paths, images=None):
+        self.clip_paths.extend(paths)
+        return [np.full(512, len(self.clip_paths), dtype=np.float32) for _ in paths]
+
+    def detect_faces_batch(self, paths, images=None):
+        return [([], [], []) for _ in paths]
+
+    def classify_scene(self, objects):
+        return {}
+
+    def get_clothing_colors(self, objects):
+        return []
+
+    def aggregate_photo_emotions(self, emotions):
+        return {}
+
+    def extract_exif(self, path, with_quality=True):
+        return {}
+
+    def calculate_frame_quality(self, image):
+        return {}
+
+    def generate_caption(self, **kwargs):
+        return ''
+
+
+def textured_frame(seed):
+    return np.random.default_rng(seed).integers(0, 256, (64, 96, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def pipeline_with(monkeypatch):
+    monkeypatch.setattr(meta_cache, 'META_CACHE_PATH', '0')
+
+    def build(frames):
+        models = RecordingModels(frames)
+        pipeline = AnalysisPipeline()
+        for name in ('face_service', 'emotion_service', 'object_service', 'clip_service', 'metadata_service'):
+            pipeline.__dict__[name] = models
+        return pipeline, models
+
+    return build
+
+
+def test_near_identical_frame_skips_yolo_and_clip(pipeline_with):
+    original = textured_frame(0)
+    edited = np.clip(original.astype(np.int16) + 2, 0, 255).astype(np.uint8)  # light edit
+    other = textured_frame(1)
+    pipeline, models = pipeline_with({'a.jpg': original, 'b.jpg': edited, 'c.jpg': other})
+
+    results = pipeline.process_photos_batch(['a.jpg', 'b.jpg', 'c.jpg'], ['a', 'b', 'c'])
+
+    assert models.yolo_paths == ['a.jpg', 'c.jpg']
+    assert models.clip_paths == ['a.jpg', 'c.jpg']
+    assert results[1]['dedup_source'] == 'a'
+    assert results[1]['objects'] == results[0]['objects']
+    np.testing.assert_array_equal(results[1]['clip_embedding'], results[0]['clip_embedding'])
+    assert 'dedup_source' not in results[2]
+
+
+def test_duplicate_of_earlier_batch_reuses_its_results(pipeline_with):
+    frame = textured_frame(2)
+    pipeline, models = pipeline_with({'first.jpg': frame, 'again.jpg': frame.copy()})
+
+    first = pipeline.process_photos_batch(['first.jpg'], ['first'])[0]
+    again = pipeline.process_photos_batch(['again.jpg'], ['again'])[0]
+
+    assert models.clip_paths == ['first.jpg']
+    assert models.yolo_paths == ['first.jpg']
+    assert again['dedup_source'] == 'first'
+    assert again['objects'] == first['objects']
+
+
+def test_missing_clip_embedding_leaves_photo_incomplete(pipeline_with):
+    pipeline, models = pipeline_with({'a.jpg': textured_frame(3)})
+    models.encode_images = lambda paths, images=None: [None for _ in paths]  # model failed to load
+
+    result = pipeline.process_photos_batch(['a.jpg'], ['a'])[0]
+
+    # app.py skips it, so it is retried next run instead of saved twice
+    assert not result['analysis_complete']
+    assert result['error']
@@ -42,12 +42,35 @@ function App() {
     }
   };
 
+  // Resolves with the job's final payload once the server reports it finished
+  const waitForProcessJob = (jobId) => new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_URL}/process/${jobId}/events`);
+    const finish = (e) => {
+      events.close();
+      resolve(JSON.parse(e.data));
+    };
+    events.addEventListener('complete', finish);
+    events.addEventListener('failed', finish);
+    events.onerror = () => {
+      events.close();
+      reject(new Error('Lost connection to processing job'));
+    };
+  });
+
   const processPhotos = async () => {
     setProcessing(true);
     setCurrentStep('processing');
     try {
       const response = await fetch(`${API_URL}/process`, { method: 'POST' });
-      const data = await response.json();
+      const job = await response.json();
+      
+      if (job.error) {
+        setError(job.error);
+        setCurrentStep('process');
+        return;
+      }
+      
+      const data = await waitForProcessJob(job.job_id);
       
       if (data.error) {
         setError(data.error);